@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+# 缓存条目上限，超出后按写入时间淘汰最旧条目
+DEFAULT_MAX_ENTRIES = 256
+# 环境变量：缓存有效期（秒），0 或未设置表示永不过期
+CACHE_TTL_ENV = "CACHE_TTL_SECS"
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def make_cache_key(mode: str, model: str, system_prompt: str, user_prompt: str) -> str:
+    """根据请求要素计算稳定的缓存键"""
+    payload = json.dumps(
+        {"mode": mode, "model": model, "sys": system_prompt, "user": user_prompt},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_prompt_key(mode: str, model: str, prompt: str, previous_code: str) -> str:
+    """根据任务要素计算缓存键（提示词先做空白归一化）
+
+    同一描述多敲一个空格或换行不应落到不同的键上。
+    """
+    payload = json.dumps(
+        {
+            "mode": mode,
+            "model": model,
+            "p": " ".join(prompt.split()),
+            "prev": previous_code,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PromptCache:
+    """任务级结果缓存：键为（提示词, 前序代码, 模式, 模型）
+
+    与 LLMCache 缓存原始响应不同，这里存的是清洗合并后的最终
+    场景代码。命中时整个任务跳过 AI 调用与代码后处理，渲染则
+    命中 manim_runner 的分段缓存，重复提交从数十秒降为磁盘查询。
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self._db_path = db_path
+        self._max_entries = max_entries
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path.as_posix())
+
+    def _init_db(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS prompt_cache (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    code TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+
+    def get(self, key: str) -> tuple[str, str] | None:
+        """命中时返回 (provider, code)，未命中返回 None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT provider, code FROM prompt_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, provider: str, code: str) -> None:
+        created_at = datetime.now().strftime(_TIME_FORMAT)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO prompt_cache (key, provider, code, created_at) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET provider = excluded.provider, "
+                "code = excluded.code, created_at = excluded.created_at",
+                (key, provider, code, created_at),
+            )
+            conn.execute(
+                "DELETE FROM prompt_cache WHERE key NOT IN ("
+                "SELECT key FROM prompt_cache ORDER BY created_at DESC LIMIT ?)",
+                (self._max_entries,),
+            )
+
+    def invalidate(self, key: str) -> None:
+        """移除失效条目（如缓存代码已无法渲染），避免污染后续任务"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM prompt_cache WHERE key = ?", (key,))
+
+
+class LLMCache:
+    """AI 响应的持久缓存（SQLite）
+
+    temperature 低时相同提示词的输出基本确定，重复请求
+    （重试、重做上一分段、开发调试）可直接复用本地结果，
+    将数十秒的网络往返降为一次本地查询，也不再消耗 token。
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self._db_path = db_path
+        self._max_entries = max_entries
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path.as_posix())
+
+    def _init_db(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ai_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+
+    def get(self, key: str) -> str | None:
+        """查询缓存，命中且未过期时返回响应，否则返回 None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM ai_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        if self._is_expired(row[1]):
+            with self._connect() as conn:
+                conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """写入缓存并在超出容量时淘汰最旧条目"""
+        created_at = datetime.now().strftime(_TIME_FORMAT)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO ai_cache (key, response, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET response = excluded.response, "
+                "created_at = excluded.created_at",
+                (key, value, created_at),
+            )
+            conn.execute(
+                "DELETE FROM ai_cache WHERE key NOT IN ("
+                "SELECT key FROM ai_cache ORDER BY created_at DESC LIMIT ?)",
+                (self._max_entries,),
+            )
+
+    @staticmethod
+    def _ttl_seconds() -> int:
+        raw = os.environ.get(CACHE_TTL_ENV, "0")
+        try:
+            return max(int(raw), 0)
+        except ValueError:
+            return 0
+
+    def _is_expired(self, created_at: str) -> bool:
+        ttl = self._ttl_seconds()
+        if ttl <= 0:
+            return False
+        try:
+            created = datetime.strptime(created_at, _TIME_FORMAT)
+        except ValueError:
+            return True
+        return datetime.now() - created > timedelta(seconds=ttl)
@@ -1,21 +1,324 @@
 from __future__ import annotations
 
-from typing import Callable
+import asyncio
+import atexit
+import json
+import random
+import re
+import textwrap
+import threading
+import time
+from collections import deque
+from typing import Callable, TypeVar
 
 import httpx
-import requests
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 try:
-    from openai import APIConnectionError, APITimeoutError
+    from openai import APIConnectionError, APIStatusError, APITimeoutError
 except ImportError:  # pragma: no cover
-    APIConnectionError = APITimeoutError = Exception
+    APIConnectionError = APIStatusError = APITimeoutError = Exception
 
-from app.config import AISettings
+from app.ai_cache import LLMCache, make_cache_key
+from app.config import AISettings, DATA_DIR, DB_NAME
+from app.rate_limiter import TokenBucket, estimate_tokens
 
 
 SECTION_MARKER = "# <<SECTION_BREAK>>"
 
+# construct 方法体的缩进（两级，4 空格制）
+_INDENT = "        "
+
+# 预编译正则：清理函数随 cumulative_code 增长每轮全量扫描，
+# C 级正则扫描比逐行 startswith/in 的 Python 循环常数小得多
+_IMPORT_RE = re.compile(r"^\s*(from\s+\S+\s+import|import\s+\S+)")
+_MARKER_RE = re.compile(re.escape(SECTION_MARKER))
+_NEXT_SECTION_RE = re.compile(r"self\.next_section\s*\(")
+_CONSTRUCT_RE = re.compile(r"def\s+construct\s*\(\s*self\s*\)\s*:")
+_STRIP_LINE_RE = re.compile(
+    rf"^.*(?:{re.escape(SECTION_MARKER)}|self\.next_section\s*\().*\n?", re.MULTILINE
+)
+
+# 生成温度：接近 0 时输出基本确定，相同提示词可安全复用缓存
+TEMPERATURE = 0.2
+
+# 流式接收时每累积这么多字符上报一次进度（接收侧有合批，开销很小）
+_STREAM_PROGRESS_STEP = 512
+
+_response_cache: LLMCache | None = None
+
+
+def _get_response_cache() -> LLMCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = LLMCache(DATA_DIR / DB_NAME)
+    return _response_cache
+
+
+# 按 (base_url, api_key) 复用客户端，避免每次调用重建连接池
+# （DNS 解析 + TCP/TLS 握手在短请求中占大头）
+_clients_lock = threading.Lock()
+_HTTPX_CLIENTS: dict[tuple[str, str], httpx.Client] = {}
+_OPENAI_CLIENTS: dict[tuple[str, str], OpenAI] = {}
+_gemini_client: httpx.Client | None = None
+
+
+def _build_httpx_client(timeout: float) -> httpx.Client:
+    """构建启用 HTTP/2 多路复用与 keep-alive 池的客户端"""
+    return httpx.Client(
+        timeout=httpx.Timeout(timeout),
+        transport=httpx.HTTPTransport(retries=3, http2=True),
+        limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60),
+        follow_redirects=True,
+    )
+
+
+def _get_deepseek_client(settings: AISettings, base_url: str, timeout: int) -> OpenAI:
+    """返回缓存的 DeepSeek 客户端，保持 keep-alive 连接跨分段复用"""
+    key = (base_url, settings.deepseek_api_key)
+    with _clients_lock:
+        client = _OPENAI_CLIENTS.get(key)
+        if client is not None:
+            return client
+        http_client = _build_httpx_client(float(timeout))
+        client = OpenAI(
+            api_key=settings.deepseek_api_key,
+            base_url=base_url,
+            timeout=httpx.Timeout(float(timeout)),
+            max_retries=0,  # 重试由 _retry 统一带抖动处理，避免嵌套退避
+            http_client=http_client,
+        )
+        _HTTPX_CLIENTS[key] = http_client
+        _OPENAI_CLIENTS[key] = client
+        return client
+
+
+def _get_gemini_client(timeout: int) -> httpx.Client:
+    """返回共享的 Gemini 客户端，复用到 googleapis 的 TCP+TLS 连接"""
+    global _gemini_client
+    with _clients_lock:
+        if _gemini_client is None:
+            _gemini_client = _build_httpx_client(float(timeout))
+        return _gemini_client
+
+
+_ASYNC_HTTPX_CLIENTS: dict[tuple[str, str], httpx.AsyncClient] = {}
+_ASYNC_OPENAI_CLIENTS: dict[tuple[str, str], AsyncOpenAI] = {}
+_gemini_async_client: httpx.AsyncClient | None = None
+
+
+def _build_async_httpx_client(timeout: float) -> httpx.AsyncClient:
+    """异步版共享客户端，配置与同步版保持一致"""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout),
+        transport=httpx.AsyncHTTPTransport(retries=3, http2=True),
+        limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60),
+        follow_redirects=True,
+    )
+
+
+def _get_async_deepseek_client(settings: AISettings, base_url: str, timeout: int) -> AsyncOpenAI:
+    key = (base_url, settings.deepseek_api_key)
+    with _clients_lock:
+        client = _ASYNC_OPENAI_CLIENTS.get(key)
+        if client is not None:
+            return client
+        http_client = _build_async_httpx_client(float(timeout))
+        client = AsyncOpenAI(
+            api_key=settings.deepseek_api_key,
+            base_url=base_url,
+            timeout=httpx.Timeout(float(timeout)),
+            max_retries=2,
+            http_client=http_client,
+        )
+        _ASYNC_HTTPX_CLIENTS[key] = http_client
+        _ASYNC_OPENAI_CLIENTS[key] = client
+        return client
+
+
+def _get_async_gemini_client(timeout: int) -> httpx.AsyncClient:
+    global _gemini_async_client
+    with _clients_lock:
+        if _gemini_async_client is None:
+            _gemini_async_client = _build_async_httpx_client(float(timeout))
+        return _gemini_async_client
+
+
+def _close_clients() -> None:
+    with _clients_lock:
+        for http_client in _HTTPX_CLIENTS.values():
+            http_client.close()
+        _HTTPX_CLIENTS.clear()
+        _OPENAI_CLIENTS.clear()
+        global _gemini_client
+        if _gemini_client is not None:
+            _gemini_client.close()
+            _gemini_client = None
+        _ASYNC_HTTPX_CLIENTS.clear()
+        _ASYNC_OPENAI_CLIENTS.clear()
+        global _gemini_async_client
+        _gemini_async_client = None
+
+
+atexit.register(_close_clients)
+
+
+_T = TypeVar("_T")
+
+# 可重试的状态码：限流与服务端瞬时错误；4xx 鉴权/参数错误不重试
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_RETRYABLE_EXCEPTIONS = (
+    APIConnectionError,
+    APITimeoutError,
+    httpx.TimeoutException,
+    httpx.NetworkError,
+)
+
+
+def _retry_status_code(exc: Exception) -> int | None:
+    """提取可重试异常的状态码，不可重试返回 None"""
+    status: int | None = None
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+    elif isinstance(exc, APIStatusError):
+        status = getattr(exc, "status_code", None)
+    if status in _RETRYABLE_STATUS:
+        return status
+    return None
+
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _retry(
+    fn: Callable[[], _T],
+    debug: Callable[[str], None] | None = None,
+    retries: int = 3,
+    base: float = 0.5,
+    cap: float = 8.0,
+) -> _T:
+    """带抖动指数退避的重试：平滑瞬时故障且避免雪崩式重发"""
+    attempt = 0
+    while True:
+        retry_after: float | None = None
+        try:
+            return fn()
+        except _RETRYABLE_EXCEPTIONS:
+            if attempt >= retries:
+                raise
+        except Exception as exc:  # noqa: BLE001
+            if _retry_status_code(exc) is None or attempt >= retries:
+                raise
+            retry_after = _retry_after_seconds(exc)
+        delay = retry_after if retry_after is not None else min(cap, base * 2**attempt)
+        delay += random.uniform(0, base)
+        if debug:
+            debug(f"请求失败，{delay:.1f}s 后重试（第 {attempt + 1}/{retries} 次）")
+        time.sleep(delay)
+        attempt += 1
+
+
+class _LatencyStats:
+    """按提供商记录滚动延迟样本，按 2×p95 给出自适应超时预算
+
+    固定 60s 超时对真正挂死的请求太慢、对快速端点又太松。
+    样本经 settings 表持久化，进程重启后沿用历史。
+    """
+
+    MAX_SAMPLES = 50
+    MIN_TIMEOUT = 15.0
+    MAX_TIMEOUT = 90.0
+
+    def __init__(self) -> None:
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def _setting_key(self, provider: str) -> str:
+        return f"latency_hist::{provider}"
+
+    def _get_samples(self, provider: str) -> deque[float]:
+        samples = self._samples.get(provider)
+        if samples is None:
+            samples = deque(maxlen=self.MAX_SAMPLES)
+            raw = _get_latency_store().get_setting(self._setting_key(provider), "")
+            if raw:
+                try:
+                    samples.extend(float(v) for v in json.loads(raw))
+                except (ValueError, TypeError):
+                    pass
+            self._samples[provider] = samples
+        return samples
+
+    def record(self, provider: str, elapsed: float) -> None:
+        with self._lock:
+            samples = self._get_samples(provider)
+            samples.append(elapsed)
+            _get_latency_store().set_setting(
+                self._setting_key(provider), json.dumps(list(samples))
+            )
+
+    def timeout_for(self, provider: str, default: float) -> float:
+        with self._lock:
+            samples = sorted(self._get_samples(provider))
+        if not samples:
+            return default
+        p95 = samples[int(0.95 * len(samples))] if len(samples) > 1 else samples[0]
+        return max(self.MIN_TIMEOUT, min(self.MAX_TIMEOUT, 2 * p95))
+
+
+_latency_store = None
+_latency_stats = _LatencyStats()
+
+
+def _get_latency_store():
+    """延迟样本的持久化存储（复用主数据库的 settings 表）"""
+    global _latency_store
+    if _latency_store is None:
+        from app.database import Database
+
+        _latency_store = Database(DATA_DIR / DB_NAME)
+    return _latency_store
+
+
+# 按 (提供商, 限额) 复用令牌桶，限额为 0 时不限流
+_rate_limiters: dict[tuple[str, int], TokenBucket] = {}
+
+
+def _get_rate_limiter(provider: str, tokens_per_min: int) -> TokenBucket | None:
+    if tokens_per_min <= 0:
+        return None
+    key = (provider, tokens_per_min)
+    with _clients_lock:
+        bucket = _rate_limiters.get(key)
+        if bucket is None:
+            bucket = TokenBucket(tokens_per_min)
+            _rate_limiters[key] = bucket
+        return bucket
+
+
+def _acquire_rate_limit(provider: str, tokens_per_min: int, prompt: str, previous_code: str) -> None:
+    bucket = _get_rate_limiter(provider, tokens_per_min)
+    if bucket is not None:
+        bucket.acquire(estimate_tokens(SYSTEM_PROMPT, prompt, previous_code))
+
+
+async def _acquire_rate_limit_async(
+    provider: str, tokens_per_min: int, prompt: str, previous_code: str
+) -> None:
+    bucket = _get_rate_limiter(provider, tokens_per_min)
+    if bucket is not None:
+        await bucket.acquire_async(estimate_tokens(SYSTEM_PROMPT, prompt, previous_code))
+
 SYSTEM_PROMPT = (
     "你是一个专业的 manim 动画工程师，负责生成连续的动画场景。\n"
     "请输出可运行的 Python 代码，用 manim 生成一个 Scene\n"
@@ -46,13 +349,78 @@ def generate_manim_code(
     timeout: int = 60,
 ) -> tuple[str, str]:
     name, provider = _resolve_provider(mode)
+    model = settings.deepseek_model if name == "deepseek" else settings.gemini_model
+    cache_key = make_cache_key(name, model, SYSTEM_PROMPT, build_prompt(prompt, previous_code))
+    # 仅在低温（近似确定性）输出时使用缓存
+    if TEMPERATURE <= 0.2:
+        cached = _get_response_cache().get(cache_key)
+        if cached is not None:
+            if debug:
+                debug(f"AI {name} 命中本地缓存，跳过网络请求")
+            return name, cached
     try:
         code = provider(settings, prompt, previous_code, debug, timeout)
-        return name, code
     except Exception as exc:  # noqa: BLE001
         if debug:
             debug(f"AI {name} 调用失败：{exc}")
         raise AIError(f"AI {name} 接口调用失败: {exc}") from exc
+    if TEMPERATURE <= 0.2:
+        _get_response_cache().set(cache_key, code)
+    return name, code
+
+
+async def agenerate_manim_code(
+    settings: AISettings,
+    mode: str,
+    prompt: str,
+    previous_code: str,
+    debug: Callable[[str], None] | None = None,
+    timeout: int = 60,
+) -> tuple[str, str]:
+    """generate_manim_code 的异步版本
+
+    多个调用（多提供商对比、批量预生成分段）可用 asyncio.gather
+    并发执行，总耗时取决于最慢的一个而非各调用之和。
+    """
+    name, provider = _resolve_async_provider(mode)
+    model = settings.deepseek_model if name == "deepseek" else settings.gemini_model
+    cache_key = make_cache_key(name, model, SYSTEM_PROMPT, build_prompt(prompt, previous_code))
+    if TEMPERATURE <= 0.2:
+        cached = _get_response_cache().get(cache_key)
+        if cached is not None:
+            if debug:
+                debug(f"AI {name} 命中本地缓存，跳过网络请求")
+            return name, cached
+    try:
+        code = await provider(settings, prompt, previous_code, debug, timeout)
+    except Exception as exc:  # noqa: BLE001
+        if debug:
+            debug(f"AI {name} 调用失败：{exc}")
+        raise AIError(f"AI {name} 接口调用失败: {exc}") from exc
+    if TEMPERATURE <= 0.2:
+        _get_response_cache().set(cache_key, code)
+    return name, code
+
+
+def generate_manim_code_concurrently(
+    settings: AISettings,
+    modes: list[str],
+    prompt: str,
+    previous_code: str,
+    debug: Callable[[str], None] | None = None,
+    timeout: int = 60,
+) -> list[tuple[str, str]]:
+    """并发调用多个 AI 提供商，供同步调用方使用"""
+
+    async def _gather() -> list[tuple[str, str]]:
+        return await asyncio.gather(
+            *(
+                agenerate_manim_code(settings, mode, prompt, previous_code, debug, timeout)
+                for mode in modes
+            )
+        )
+
+    return asyncio.run(_gather())
 
 
 def _resolve_provider(
@@ -65,6 +433,21 @@ def _resolve_provider(
     raise AIError("未指定有效的 AI 模式")
 
 
+def _resolve_async_provider(mode: str):
+    if mode == "deepseek":
+        return "deepseek", _acall_deepseek
+    if mode == "gemini":
+        return "gemini", _acall_gemini
+    raise AIError("未指定有效的 AI 模式")
+
+
+def _deepseek_base_url(settings: AISettings) -> str:
+    base = settings.deepseek_base_url.strip().rstrip("/")
+    if not base.startswith("http://") and not base.startswith("https://"):
+        base = f"https://{base}"
+    return f"{base}/v1"
+
+
 def _call_deepseek(
     settings: AISettings,
     prompt: str,
@@ -74,47 +457,57 @@ def _call_deepseek(
 ) -> str:
     if not settings.deepseek_api_key:
         raise AIError("DeepSeek API Key 未配置")
-    base = settings.deepseek_base_url.strip().rstrip("/")
-    if not base.startswith("http://") and not base.startswith("https://"):
-        base = f"https://{base}"
-    base_url = f"{base}/v1"
+    base_url = _deepseek_base_url(settings)
     url = f"{base_url}/chat/completions"
     if debug:
         debug(f"DeepSeek 请求：{url} | model={settings.deepseek_model}")
+    budget = _latency_stats.timeout_for("deepseek", float(timeout))
     if debug:
-        debug(f"DeepSeek 请求已发送，超时 {timeout}s")
-    timeout_config = httpx.Timeout(float(timeout))
-    transport = httpx.HTTPTransport(retries=3)
-    with httpx.Client(
-        timeout=timeout_config,
-        transport=transport,
-        follow_redirects=True,
-    ) as http_client:
-        client = OpenAI(
-            api_key=settings.deepseek_api_key,
-            base_url=base_url,
-            timeout=timeout_config,
-            max_retries=2,
-            http_client=http_client,
+        debug(f"DeepSeek 请求已发送，超时 {budget:.0f}s")
+    _acquire_rate_limit("deepseek", settings.deepseek_tokens_per_min, prompt, previous_code)
+    client = _get_deepseek_client(settings, base_url, timeout)
+
+    def _consume_stream() -> str:
+        # 流式接收：首字节到达即开始累积，不必等完整生成结束
+        stream = client.chat.completions.create(
+            model=settings.deepseek_model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": build_prompt(prompt, previous_code)},
+            ],
+            temperature=TEMPERATURE,
+            timeout=budget,
+            stream=True,
         )
-        try:
-            response = client.chat.completions.create(
-                model=settings.deepseek_model,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": build_prompt(prompt, previous_code)},
-                ],
-                temperature=0.2,
-            )
-        except (APIConnectionError, APITimeoutError) as exc:
-            raise AIError(
-                "DeepSeek 连接失败，请检查网络/代理设置或 base_url 是否可达"
-            ) from exc
-        except httpx.HTTPError as exc:
-            raise AIError(
-                "DeepSeek 连接失败，请检查网络/代理设置或 base_url 是否可达"
-            ) from exc
-    content = response.choices[0].message.content
+        parts: list[str] = []
+        received = 0
+        next_report = _STREAM_PROGRESS_STEP
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            if delta:
+                if debug and not parts:
+                    debug("DeepSeek 开始接收流式响应")
+                parts.append(delta)
+                received += len(delta)
+                if debug and received >= next_report:
+                    debug(f"生成中，已接收 {received} 字符")
+                    next_report = received + _STREAM_PROGRESS_STEP
+        return "".join(parts)
+
+    started = time.monotonic()
+    try:
+        content = _retry(_consume_stream, debug)
+    except (APIConnectionError, APITimeoutError) as exc:
+        raise AIError(
+            "DeepSeek 连接失败，请检查网络/代理设置或 base_url 是否可达"
+        ) from exc
+    except httpx.HTTPError as exc:
+        raise AIError(
+            "DeepSeek 连接失败，请检查网络/代理设置或 base_url 是否可达"
+        ) from exc
+    _latency_stats.record("deepseek", time.monotonic() - started)
     if not content:
         raise AIError("DeepSeek 返回内容为空")
     if debug:
@@ -133,11 +526,11 @@ def _call_gemini(
         raise AIError("Gemini API Key 未配置")
     url = (
         "https://generativelanguage.googleapis.com/v1beta/models/"
-        f"{settings.gemini_model}:generateContent"
+        f"{settings.gemini_model}:streamGenerateContent"
     )
     if debug:
         debug(f"Gemini 请求：{url} | model={settings.gemini_model}")
-    params = {"key": settings.gemini_api_key}
+    params = {"key": settings.gemini_api_key, "alt": "sse"}
     payload = {
         "contents": [
             {
@@ -145,18 +538,63 @@ def _call_gemini(
                 "parts": [{"text": f"{SYSTEM_PROMPT}\n{build_prompt(prompt, previous_code)}"}],
             }
         ],
-        "generationConfig": {"temperature": 0.2},
+        "generationConfig": {"temperature": TEMPERATURE},
     }
+    budget = _latency_stats.timeout_for("gemini", float(timeout))
     if debug:
-        debug(f"Gemini 请求已发送，超时 {timeout}s")
-    response = requests.post(
-        url,
-        params=params,
-        json=payload,
-        timeout=timeout,
-    )
-    response.raise_for_status()
-    data = response.json()
+        debug(f"Gemini 请求已发送，超时 {budget:.0f}s")
+    _acquire_rate_limit("gemini", settings.gemini_tokens_per_min, prompt, previous_code)
+
+    def _consume_stream() -> str:
+        # SSE 流式接收：逐事件累积文本片段
+        parts: list[str] = []
+        received = 0
+        next_report = _STREAM_PROGRESS_STEP
+        with _get_gemini_client(timeout).stream(
+            "POST", url, params=params, json=payload, timeout=budget
+        ) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if not data:
+                    continue
+                try:
+                    chunk = json.loads(data)
+                except ValueError:
+                    continue
+                text = _gemini_chunk_text(chunk)
+                if text:
+                    if debug and not parts:
+                        debug("Gemini 开始接收流式响应")
+                    parts.append(text)
+                    received += len(text)
+                    if debug and received >= next_report:
+                        debug(f"生成中，已接收 {received} 字符")
+                        next_report = received + _STREAM_PROGRESS_STEP
+        return "".join(parts)
+
+    started = time.monotonic()
+    content = _retry(_consume_stream, debug).strip()
+    _latency_stats.record("gemini", time.monotonic() - started)
+    if not content:
+        raise AIError("Gemini 返回内容为空")
+    if debug:
+        debug("Gemini 返回成功")
+    return content
+
+
+def _gemini_chunk_text(chunk: dict) -> str:
+    """提取单个流式事件中的文本片段"""
+    candidates = chunk.get("candidates", [])
+    if not candidates:
+        return ""
+    parts = candidates[0].get("content", {}).get("parts", [])
+    return "".join(part.get("text", "") for part in parts)
+
+
+def _parse_gemini_response(data: dict) -> str:
     candidates = data.get("candidates", [])
     if not candidates:
         raise AIError("Gemini 返回为空")
@@ -165,6 +603,93 @@ def _call_gemini(
     content = "\n".join(text_parts).strip()
     if not content:
         raise AIError("Gemini 返回内容为空")
+    return content
+
+
+async def _acall_deepseek(
+    settings: AISettings,
+    prompt: str,
+    previous_code: str,
+    debug: Callable[[str], None] | None,
+    timeout: int,
+) -> str:
+    if not settings.deepseek_api_key:
+        raise AIError("DeepSeek API Key 未配置")
+    base_url = _deepseek_base_url(settings)
+    if debug:
+        debug(f"DeepSeek 异步请求：{base_url}/chat/completions | model={settings.deepseek_model}")
+    budget = _latency_stats.timeout_for("deepseek", float(timeout))
+    await _acquire_rate_limit_async(
+        "deepseek", settings.deepseek_tokens_per_min, prompt, previous_code
+    )
+    client = _get_async_deepseek_client(settings, base_url, timeout)
+    started = time.monotonic()
+    try:
+        response = await client.chat.completions.create(
+            model=settings.deepseek_model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": build_prompt(prompt, previous_code)},
+            ],
+            temperature=TEMPERATURE,
+            timeout=budget,
+        )
+    except (APIConnectionError, APITimeoutError) as exc:
+        raise AIError(
+            "DeepSeek 连接失败，请检查网络/代理设置或 base_url 是否可达"
+        ) from exc
+    except httpx.HTTPError as exc:
+        raise AIError(
+            "DeepSeek 连接失败，请检查网络/代理设置或 base_url 是否可达"
+        ) from exc
+    _latency_stats.record("deepseek", time.monotonic() - started)
+    content = response.choices[0].message.content
+    if not content:
+        raise AIError("DeepSeek 返回内容为空")
+    if debug:
+        debug("DeepSeek 返回成功")
+    return content
+
+
+async def _acall_gemini(
+    settings: AISettings,
+    prompt: str,
+    previous_code: str,
+    debug: Callable[[str], None] | None,
+    timeout: int,
+) -> str:
+    if not settings.gemini_api_key:
+        raise AIError("Gemini API Key 未配置")
+    url = (
+        "https://generativelanguage.googleapis.com/v1beta/models/"
+        f"{settings.gemini_model}:generateContent"
+    )
+    if debug:
+        debug(f"Gemini 异步请求：{url} | model={settings.gemini_model}")
+    params = {"key": settings.gemini_api_key}
+    payload = {
+        "contents": [
+            {
+                "role": "user",
+                "parts": [{"text": f"{SYSTEM_PROMPT}\n{build_prompt(prompt, previous_code)}"}],
+            }
+        ],
+        "generationConfig": {"temperature": TEMPERATURE},
+    }
+    budget = _latency_stats.timeout_for("gemini", float(timeout))
+    await _acquire_rate_limit_async(
+        "gemini", settings.gemini_tokens_per_min, prompt, previous_code
+    )
+    started = time.monotonic()
+    response = await _get_async_gemini_client(timeout).post(
+        url,
+        params=params,
+        json=payload,
+        timeout=budget,
+    )
+    response.raise_for_status()
+    _latency_stats.record("gemini", time.monotonic() - started)
+    content = _parse_gemini_response(response.json())
     if debug:
         debug("Gemini 返回成功")
     return content
@@ -177,7 +702,7 @@ def sanitize_code(code: str, previous_code: str = "") -> str:
     if previous_code.strip():
         # 追加模式：移除开头的 import 语句
         lines = cleaned.splitlines()
-        while lines and (lines[0].startswith("from ") or lines[0].startswith("import ")):
+        while lines and _IMPORT_RE.match(lines[0]):
             lines.pop(0)
         return "\n".join(lines).strip()
 
@@ -189,21 +714,28 @@ def sanitize_code(code: str, previous_code: str = "") -> str:
 
 
 def build_prompt(prompt: str, previous_code: str) -> str:
-    """构建发送给 AI 的完整提示词"""
-    if previous_code.strip():
+    """构建发送给 AI 的完整提示词
+
+    稳定内容在前、易变内容在后：规则常量不变，场景代码每轮只在
+    末尾追加，于是 [系统提示 + 规则 + 代码] 构成跨轮次字节级一致
+    的前缀，服务端的自动前缀/KV 缓存（DeepSeek context caching、
+    Gemini 隐式缓存）可以直接复用，新需求放在最后不破坏前缀。
+    """
+    stripped_previous = previous_code.strip()
+    if stripped_previous:
         return (
-            f"以下是当前场景的完整代码：\n\n"
-            f"```python\n{previous_code.strip()}\n```\n\n"
-            f"需求：{prompt}\n\n"
-            f"请在 `construct` 方法的末尾续写代码以实现上述需求。\n"
+            f"请在 `construct` 方法的末尾续写代码以实现最后给出的需求。\n"
             f"严格遵守以下规则：\n"
             f"1. 仅返回新增的代码片段，不要重复已有代码\n"
             f"2. 新增代码必须以 `{SECTION_MARKER}` 开头\n"
             f"3. 不要包含 `class` 定义或 `def construct`\n"
             f"4. 保持变量名和场景状态的连贯性\n"
-            f"5. 不要使用 `self.next_section()`，使用标记代替"
+            f"5. 不要使用 `self.next_section()`，使用标记代替\n\n"
+            f"以下是当前场景的完整代码：\n\n"
+            f"```python\n{stripped_previous}\n```\n\n"
+            f"需求：{prompt}"
         )
-    
+
     return f"创建一个新的 manim 场景来实现：{prompt}（不要包含 {SECTION_MARKER} 或 self.next_section()）"
 
 
@@ -215,99 +747,85 @@ def ensure_section_addition(existing_code: str, ai_response: str, current_prompt
         return _strip_markers_and_sections(cleaned)
 
     # 处理包含 SECTION_MARKER 的响应
-    if SECTION_MARKER in cleaned:
+    if _MARKER_RE.search(cleaned):
         parts = cleaned.split(SECTION_MARKER, 1)
         if len(parts) > 1:
             cleaned = _remove_common_indent(parts[1])
 
-    # 找到 construct 方法中的插入位置
+    # 只拆分一次，后续全部在行列表上操作，最后统一 join，
+    # 避免随 cumulative_code 增长而重复整串复制
     lines = existing_code.split('\n')
     insert_pos = _find_construct_insert_position(lines)
-                 
+
     # 添加新分段
     new_section_lines = [
         "",
-        "        # 新分段",
-        f"        {SECTION_MARKER}",
+        f"{_INDENT}# 新分段",
+        f"{_INDENT}{SECTION_MARKER}",
         "",
     ]
 
     # 添加 AI 生成的代码（确保正确缩进）
-    for line in (cleaned.split('\n') if cleaned else []):
-        if line.strip():
-            new_section_lines.append(f"        {line}" if not line.startswith('        ') else line)
-        else:
-            new_section_lines.append("")
+    if cleaned:
+        new_section_lines.extend(
+            (line if line.startswith(_INDENT) else f"{_INDENT}{line}") if line.strip() else ""
+            for line in cleaned.split('\n')
+        )
 
     lines[insert_pos:insert_pos] = new_section_lines
-    return _replace_section_marker('\n'.join(lines))
+    _replace_section_marker_lines(lines)
+    return '\n'.join(lines)
 
 
 def _remove_common_indent(code: str) -> str:
-    """移除代码块的公共缩进"""
-    lines = [line for line in code.splitlines() if line.strip()]
-    if not lines:
-        return ""
-    
-    # 找到最小缩进
-    min_indent = min(len(line) - len(line.lstrip()) for line in lines if line.strip())
-    return "\n".join(line[min_indent:] if len(line) > min_indent else line for line in lines).strip()
+    """移除代码块的公共缩进（textwrap.dedent 为 C 实现的单次扫描）"""
+    return textwrap.dedent(code).strip()
 
 
 def _find_construct_insert_position(lines: list[str]) -> int:
     """找到 construct 方法中最后一行代码的位置"""
     found_construct = False
+    construct_line = -1
     last_indented_line = -1
-    
+
     for i, line in enumerate(lines):
-        if "def construct(self):" in line:
+        if not found_construct and _CONSTRUCT_RE.search(line):
             found_construct = True
+            construct_line = i
         # 找到 construct 方法内的最后一行有效代码
-        if found_construct and (line.startswith("    ") or line.startswith("\t")) and line.strip():
+        if found_construct and line[:1] in (" ", "\t") and line.strip():
             last_indented_line = i
-    
+
     if last_indented_line != -1:
         return last_indented_line + 1
-    
+
     # 如果找不到，返回 construct 定义的下一行
-    for i, line in enumerate(lines):
-        if "def construct(self):" in line:
-            return i + 1
-    
+    if construct_line != -1:
+        return construct_line + 1
+
     return len(lines)
 
 
 def _strip_markers_and_sections(code: str) -> str:
     """首轮：移除标记与 self.next_section()，确保只生成一个分段"""
-    cleaned_lines: list[str] = []
-    for line in code.split('\n'):
-        stripped = line.strip()
-        if SECTION_MARKER in line:
-            continue
-        if "self.next_section()" in stripped:
-            continue
-        cleaned_lines.append(line)
-    return "\n".join(cleaned_lines).strip() + "\n"
-
-
-def _replace_section_marker(code: str) -> str:
-    """将标记替换为 self.next_section()，并确保仅保留一个标记"""
-    lines = code.split('\n')
-    marker_indices = [i for i, line in enumerate(lines) if SECTION_MARKER in line]
-    
+    return _STRIP_LINE_RE.sub("", code).strip() + "\n"
+
+
+def _replace_section_marker_lines(lines: list[str]) -> None:
+    """将标记替换为 self.next_section()，并确保仅保留一个标记（就地修改）"""
+    marker_indices = [i for i, line in enumerate(lines) if _MARKER_RE.search(line)]
+
     if not marker_indices:
-        return code
-    
+        return
+
     # 替换第一个标记
     first_idx = marker_indices[0]
     indent = lines[first_idx][:len(lines[first_idx]) - len(lines[first_idx].lstrip())]
     lines[first_idx] = f"{indent}self.next_section()"
-    
+
     # 删除其他标记
     for idx in reversed(marker_indices[1:]):
         lines.pop(idx)
-    
-    return "\n".join(lines)
 
 
 def _strip_code_fences(code: str) -> str:
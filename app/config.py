@@ -19,6 +19,8 @@ DEFAULT_QUALITY = "k"
 DEFAULT_DEEPSEEK_BASE_URL = "https://api.deepseek.com"
 DEFAULT_DEEPSEEK_MODEL = "deepseek-chat"
 DEFAULT_GEMINI_MODEL = "gemini-1.5-flash"
+# 每分钟 token 限额（主动限流用），0 表示不限流
+DEFAULT_TOKENS_PER_MIN = 0
 
 
 @dataclass(frozen=True)
@@ -36,3 +38,5 @@ class AISettings:
     deepseek_model: str
     gemini_api_key: str
     gemini_model: str
+    deepseek_tokens_per_min: int = DEFAULT_TOKENS_PER_MIN
+    gemini_tokens_per_min: int = DEFAULT_TOKENS_PER_MIN
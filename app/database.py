@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -19,14 +20,46 @@ class Segment:
     created_at: str
 
 
+@dataclass(frozen=True)
+class SegmentMeta:
+    """分段的轻量视图：列表展示不需要加载累积代码"""
+    id: int
+    workspace: str
+    segment_index: int
+    input_text: str
+    section_video_path: str
+    created_at: str
+
+
 class Database:
     def __init__(self, db_path: Path) -> None:
         self._db_path = db_path
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        # 每工作区最新累积代码的进程内缓存：脚本随分段增长可达数百 KB，
+        # 每次 AI 调用前重读一遍数据库没有必要
+        self._latest_code_cache: dict[str, str] = {}
+        self._cache_lock = threading.Lock()
         self._init_db()
 
     def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(self._db_path.as_posix())
+        """返回当前线程复用的连接（首次使用时创建并配置 WAL）
+
+        每次操作新开连接要重复付出文件打开与日志初始化的成本；
+        WAL + synchronous=NORMAL 让读写并发且不再每条语句 fsync。
+        """
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path.as_posix())
+            conn.executescript(
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA temp_store=MEMORY;"
+                "PRAGMA cache_size=-16384;"
+                "PRAGMA mmap_size=268435456;"
+            )
+            self._local.conn = conn
+        return conn
 
     def _init_db(self) -> None:
         with self._connect() as conn:
@@ -52,7 +85,20 @@ class Database:
                 """
             )
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_segments_workspace ON segments(workspace)"
+                """
+                CREATE TABLE IF NOT EXISTS ai_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            # 复合索引：workspace 过滤 + segment_index 排序/MAX 均走索引，
+            # 避免每次查询对分段做文件排序；旧的单列索引被其完全覆盖
+            conn.execute("DROP INDEX IF EXISTS idx_segments_workspace")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_segments_ws_idx "
+                "ON segments(workspace, segment_index DESC)"
             )
             self._migrate_tables(conn)
 
@@ -67,15 +113,28 @@ class Database:
                 "SELECT workspace, input_text, manim_code, video_path, created_at FROM history ORDER BY id"
             ).fetchall()
             workspace_counts: dict[str, int] = {}
-            for row in rows:
-                workspace = row[0] or "default"
+
+            def _next_index(workspace: str) -> int:
                 idx = workspace_counts.get(workspace, 0)
-                conn.execute(
-                    "INSERT INTO segments (workspace, segment_index, input_text, cumulative_code, section_video_path, created_at) "
-                    "VALUES (?, ?, ?, ?, ?, ?)",
-                    (workspace, idx, row[1], row[2] or "", row[3] or "", row[4]),
-                )
                 workspace_counts[workspace] = idx + 1
+                return idx
+
+            # 单条 executemany 批量插入，N 行迁移只提交一次
+            conn.executemany(
+                "INSERT INTO segments (workspace, segment_index, input_text, cumulative_code, section_video_path, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        row[0] or "default",
+                        _next_index(row[0] or "default"),
+                        row[1],
+                        row[2] or "",
+                        row[3] or "",
+                        row[4],
+                    )
+                    for row in rows
+                ],
+            )
             conn.execute("DROP TABLE history")
         except sqlite3.OperationalError:
             pass
@@ -98,7 +157,11 @@ class Database:
                 (workspace, segment_index, input_text, created_at),
             )
             segment_id = int(cursor.lastrowid)
-        
+
+        # 新分段的累积代码为空，最新值随之改变
+        with self._cache_lock:
+            self._latest_code_cache.pop(workspace, None)
+
         return Segment(
             id=segment_id,
             workspace=workspace,
@@ -116,6 +179,13 @@ class Database:
                 "UPDATE segments SET cumulative_code = ?, section_video_path = ? WHERE id = ?",
                 (cumulative_code, section_video_path, segment_id),
             )
+            row = conn.execute(
+                "SELECT workspace FROM segments WHERE id = ?",
+                (segment_id,),
+            ).fetchone()
+        if row:
+            with self._cache_lock:
+                self._latest_code_cache[row[0]] = cumulative_code
 
     def list_segments(self, workspace: str, limit: int = 200) -> list[Segment]:
         """按 segment_index 降序列出分段（最新优先）"""
@@ -127,6 +197,30 @@ class Database:
             ).fetchall()
         return [self._row_to_segment(row) for row in rows]
 
+    def list_segments_meta(self, workspace: str, limit: int = 200) -> list[SegmentMeta]:
+        """按 segment_index 降序列出分段元信息（不含累积代码）
+
+        侧边栏只展示描述与播放按钮，跳过 cumulative_code 列可避免
+        把每个分段完整脚本都读进内存。
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, workspace, segment_index, input_text, section_video_path, created_at "
+                "FROM segments WHERE workspace = ? ORDER BY segment_index DESC LIMIT ?",
+                (workspace, limit),
+            ).fetchall()
+        return [
+            SegmentMeta(
+                id=int(row[0]),
+                workspace=row[1],
+                segment_index=int(row[2]),
+                input_text=row[3],
+                section_video_path=row[4] or "",
+                created_at=row[5],
+            )
+            for row in rows
+        ]
+
     def list_segments_asc(self, workspace: str) -> list[Segment]:
         """按 segment_index 升序列出分段（用于连续播放）"""
         with self._connect() as conn:
@@ -139,12 +233,19 @@ class Database:
 
     def get_latest_cumulative_code(self, workspace: str) -> str:
         """获取工作区最新的累积代码（用于继续添加分段）"""
+        with self._cache_lock:
+            cached = self._latest_code_cache.get(workspace)
+        if cached is not None:
+            return cached
         with self._connect() as conn:
             row = conn.execute(
                 "SELECT cumulative_code FROM segments WHERE workspace = ? ORDER BY segment_index DESC LIMIT 1",
                 (workspace,),
             ).fetchone()
-        return row[0] if row and row[0] else ""
+        code = row[0] if row and row[0] else ""
+        with self._cache_lock:
+            self._latest_code_cache[workspace] = code
+        return code
 
     def get_segment_count(self, workspace: str) -> int:
         """获取工作区分段数量"""
@@ -174,6 +275,19 @@ class Database:
             ).fetchone()
         return row[0] if row else default
 
+    def get_settings(self, keys: Iterable[str]) -> dict[str, str]:
+        """一次查询取回多个设置项（单条 IN 查询代替逐键往返）"""
+        key_list = list(keys)
+        if not key_list:
+            return {}
+        placeholders = ",".join("?" * len(key_list))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT key, value FROM settings WHERE key IN ({placeholders})",
+                key_list,
+            ).fetchall()
+        return dict(rows)
+
     def set_setting(self, key: str, value: str) -> None:
         with self._connect() as conn:
             conn.execute(
@@ -183,20 +297,36 @@ class Database:
             )
 
     def bulk_set_settings(self, items: Iterable[tuple[str, str]]) -> None:
-        with self._connect() as conn:
+        # 显式单事务提交全部行，迭代器直接传入 executemany 不额外物化
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
             conn.executemany(
                 "INSERT INTO settings (key, value) VALUES (?, ?) "
                 "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
-                list(items),
+                items,
             )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
 
     def delete_workspace_data(self, workspace: str) -> None:
         """删除工作区的所有分段和设置"""
         with self._connect() as conn:
             conn.execute("DELETE FROM segments WHERE workspace = ?", (workspace,))
             conn.execute("DELETE FROM settings WHERE key LIKE ?", (f"%::{workspace}",))
+        with self._cache_lock:
+            self._latest_code_cache.pop(workspace, None)
 
     def delete_segment(self, segment_id: int) -> None:
         """删除指定的分段"""
         with self._connect() as conn:
+            row = conn.execute(
+                "SELECT workspace FROM segments WHERE id = ?",
+                (segment_id,),
+            ).fetchone()
             conn.execute("DELETE FROM segments WHERE id = ?", (segment_id,))
+        if row:
+            with self._cache_lock:
+                self._latest_code_cache.pop(row[0], None)
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import hashlib
+import os
 import re
+import shutil
 import subprocess
+import threading
+from collections import deque
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Callable
 
@@ -23,23 +29,128 @@ class RenderError(RuntimeError):
 
 
 SCENE_CLASS_RE = re.compile(r"class\s+(\w+)\s*\(\s*Scene\s*\)")
+NEXT_SECTION_RE = re.compile(r"self\.next_section\s*\(")
+_NUM_RE = re.compile(r"(\d+)")
 
 
+def _natural_key(path: Path) -> list[int | str]:
+    """文件名自然排序键：section_2 排在 section_10 之前"""
+    return [int(part) if part.isdigit() else part for part in _NUM_RE.split(path.name)]
+
+
+@lru_cache(maxsize=32)
 def extract_scene_class(code: str) -> str:
-    match = SCENE_CLASS_RE.search(code)
+    # 类定义总在文件头部：先只扫前 4KB，避免随累积代码增长全量搜索；
+    # 相同代码的结果由 lru_cache 直接命中
+    match = SCENE_CLASS_RE.search(code, 0, min(len(code), 4096))
+    if not match:
+        match = SCENE_CLASS_RE.search(code)
     if not match:
         raise RenderError("未找到 Scene 子类，请检查 AI 输出")
     return match.group(1)
 
 
 def write_cumulative_script(job_dir: Path, cumulative_code: str) -> Path:
-    """写入累积的场景代码"""
+    """写入累积的场景代码（内容未变则跳过，写入走临时文件原子替换）"""
     job_dir.mkdir(parents=True, exist_ok=True)
     script_path = job_dir / "scene.py"
-    script_path.write_text(cumulative_code, encoding="utf-8")
+    hash_path = job_dir / ".scene.hash"
+    new_bytes = cumulative_code.encode("utf-8")
+    new_hash = hashlib.blake2b(new_bytes, digest_size=16).hexdigest()
+
+    # 内容没变时（如仅调整渲染参数重渲）直接复用现有脚本
+    if script_path.exists():
+        try:
+            if hash_path.read_text(encoding="utf-8") == new_hash:
+                return script_path
+        except OSError:
+            pass
+
+    # 先写临时文件再 os.replace，避免 manim 子进程读到写了一半的脚本
+    tmp_path = script_path.with_name("scene.py.tmp")
+    tmp_path.write_bytes(new_bytes)
+    os.replace(tmp_path, script_path)
+    hash_path.write_text(new_hash, encoding="utf-8")
     return script_path
 
 
+def split_sections(code: str) -> list[str]:
+    """按 self.next_section() 把累积代码切成有序分段"""
+    sections: list[list[str]] = [[]]
+    for line in code.split("\n"):
+        if NEXT_SECTION_RE.search(line):
+            sections.append([])
+            continue
+        sections[-1].append(line)
+    return ["\n".join(section) for section in sections]
+
+
+def section_prefix_hashes(code: str, settings: RenderSettings) -> list[str]:
+    """计算每个分段的缓存键
+
+    分段的画面依赖其之前的全部代码（场景状态是累积的），
+    因此键取到该分段为止的完整前缀哈希，并混入渲染参数。
+    """
+    seed = f"{settings.width}x{settings.height}@{settings.fps}|{settings.quality}\n"
+    hasher = hashlib.blake2b(seed.encode("utf-8"), digest_size=16)
+    hashes: list[str] = []
+    for section in split_sections(code):
+        hasher.update(section.encode("utf-8"))
+        hashes.append(hasher.copy().hexdigest())
+    return hashes
+
+
+# 跨工作区共享的渲染缓存目录（隐藏名，工作区扫描会跳过）
+_SHARED_CACHE_DIRNAME = ".render_cache"
+# 共享缓存文件数上限，超出按 mtime 淘汰最旧；对外暴露的始终是
+# 工作区内的硬链接，淘汰共享副本不影响历史分段的可播放性
+_SHARED_CACHE_CAP = 256
+
+
+def _evict_shared_cache(cache_dir: Path) -> None:
+    try:
+        entries = sorted(cache_dir.glob("*.mp4"), key=lambda p: p.stat().st_mtime)
+    except OSError:
+        return
+    for stale in entries[: max(0, len(entries) - _SHARED_CACHE_CAP)]:
+        try:
+            stale.unlink()
+        except OSError:
+            pass
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """优先硬链接（零拷贝），跨文件系统时退化为复制"""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if dst.exists():
+        dst.unlink()
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def _quality_dir_name(settings: RenderSettings) -> str:
+    """manim 按 <高度>p<帧率> 命名输出子目录"""
+    return f"{settings.height}p{settings.fps}"
+
+
+def expected_video_path(
+    script_path: Path,
+    class_name: str,
+    settings: RenderSettings,
+    output_dir: Path,
+) -> Path:
+    """根据 media_dir 布局直接计算主视频路径，避免整树扫描"""
+    return (
+        output_dir
+        / "videos"
+        / script_path.stem
+        / _quality_dir_name(settings)
+        / f"{class_name}.mp4"
+    )
+
+
 def build_manim_command(
     script_path: Path,
     class_name: str,
@@ -70,21 +181,48 @@ def run_manim(
     settings: RenderSettings,
     output_dir: Path,
     timeout: int = 600,
+    logger: Callable[[str], None] | None = None,
 ) -> Path:
     output_dir.mkdir(parents=True, exist_ok=True)
     command = build_manim_command(script_path, class_name, settings, output_dir)
+
+    # 流式读取输出：日志即时回传 UI，内存只保留末尾若干行用于报错
+    tail: deque[str] = deque(maxlen=200)
+    timed_out = threading.Event()
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+    )
+
+    def _kill_on_timeout() -> None:
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, _kill_on_timeout)
+    timer.start()
     try:
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=timeout,
-        )
-    except subprocess.TimeoutExpired as exc:
-        raise RenderError(f"Manim 渲染超时（{timeout}s）") from exc
-    if result.returncode != 0:
-        raise RenderError(result.stderr or result.stdout)
+        assert process.stdout is not None
+        for line in process.stdout:
+            line = line.rstrip()
+            tail.append(line)
+            if logger:
+                logger(line)
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+
+    if timed_out.is_set():
+        raise RenderError(f"Manim 渲染超时（{timeout}s）")
+    if returncode != 0:
+        raise RenderError("\n".join(tail))
+
+    # 先查预期路径（一次 stat），找不到再降级为整树扫描
+    expected = expected_video_path(script_path, class_name, settings, output_dir)
+    if expected.exists():
+        return expected
 
     candidates = list(output_dir.rglob("render.mp4"))
     if not candidates:
@@ -95,22 +233,25 @@ def run_manim(
     return latest
 
 
-def find_section_videos(job_dir: Path, class_name: str) -> list[Path]:
+def find_section_videos(job_dir: Path, class_name: str, settings: RenderSettings) -> list[Path]:
     """查找分段视频文件"""
-    sections_dir = job_dir / "videos" / "scene" / "1080p30" / "sections"
+    sections_dir = (
+        job_dir / "videos" / "scene" / _quality_dir_name(settings) / "sections"
+    )
     if not sections_dir.exists():
         # fallback to other possible locations
         for quality_dir in job_dir.glob("videos/*/*/sections"):
             if quality_dir.exists():
                 sections_dir = quality_dir
                 break
-    
+
     if not sections_dir.exists():
         return []
-    
-    # 查找所有分段视频，按名称排序
+
+    # 查找所有分段视频，按文件名自然序排序（单层目录，非递归）；
+    # 纯字典序会把 _10 排到 _2 前面，导致索引取错分段
     section_files = list(sections_dir.glob("*.mp4"))
-    return sorted(section_files, key=lambda p: p.name)
+    return sorted(section_files, key=_natural_key)
 
 
 def render_manim_scene(
@@ -119,21 +260,76 @@ def render_manim_scene(
     job_dir: Path,
     logger: Callable[[str], None] | None = None,
 ) -> RenderResult:
-    """渲染累积的 manim 场景并返回分段视频"""
+    """渲染累积的 manim 场景并返回分段视频
+
+    分段视频按（代码前缀 + 渲染参数）哈希缓存在 job_dir/section_cache，
+    并回填到 jobs 根目录下的共享缓存供其他工作区复用；
+    全部命中时直接复用，跳过整场 manim 渲染；部分命中时仍整场渲染
+    （分段画面依赖前序场景状态，单独渲染尾段语义不成立），未变动画
+    交由 manim 自身的部分影片缓存加速。
+    """
     class_name = extract_scene_class(cumulative_code)
     script_path = write_cumulative_script(job_dir, cumulative_code)
+
+    prefix_hashes = section_prefix_hashes(cumulative_code, settings)
+    cache_dir = job_dir / "section_cache"
+    cached_sections = [cache_dir / f"{h}.mp4" for h in prefix_hashes]
+    cached_full = cache_dir / f"full_{prefix_hashes[-1]}.mp4"
+
+    if cached_full.exists() and all(p.exists() for p in cached_sections):
+        if logger:
+            logger(f"命中分段缓存（{len(cached_sections)} 段），跳过 manim 渲染")
+        return RenderResult(
+            video_path=cached_full,
+            script_path=script_path,
+            class_name=class_name,
+            section_videos=cached_sections,
+        )
+
+    # 二级查找：跨工作区共享缓存。字节级相同的代码 + 渲染参数
+    # （确定性 AI 在不同工作区给出同样输出时常见）命中后硬链接
+    # 回本工作区缓存，同样跳过整场渲染
+    shared_dir = job_dir.parent / _SHARED_CACHE_DIRNAME
+    shared_sections = [shared_dir / p.name for p in cached_sections]
+    shared_full = shared_dir / cached_full.name
+    if shared_full.exists() and all(p.exists() for p in shared_sections):
+        for src, dst in zip(shared_sections, cached_sections):
+            _link_or_copy(src, dst)
+        _link_or_copy(shared_full, cached_full)
+        if logger:
+            logger(f"命中共享渲染缓存（{len(cached_sections)} 段），跳过 manim 渲染")
+        return RenderResult(
+            video_path=cached_full,
+            script_path=script_path,
+            class_name=class_name,
+            section_videos=cached_sections,
+        )
+
     if logger:
         logger(f"Scene: {class_name} | 脚本: {script_path}")
         command = build_manim_command(script_path, class_name, settings, job_dir)
         logger("Manim 命令: " + " ".join(command))
-    
-    video_path = run_manim(script_path, class_name, settings, job_dir)
-    section_videos = find_section_videos(job_dir, class_name)
-    
+
+    video_path = run_manim(script_path, class_name, settings, job_dir, logger=logger)
+    section_videos = find_section_videos(job_dir, class_name, settings)
+
+    # 回填缓存：分段数吻合时以稳定的哈希路径对外暴露，
+    # 后续渲染覆盖 media 目录也不影响历史分段的可播放性
+    if section_videos and len(section_videos) == len(cached_sections):
+        for src, dst in zip(section_videos, cached_sections):
+            _link_or_copy(src, dst)
+        section_videos = cached_sections
+        for src, dst in zip(cached_sections, shared_sections):
+            _link_or_copy(src, dst)
+    _link_or_copy(video_path, cached_full)
+    video_path = cached_full
+    _link_or_copy(cached_full, shared_full)
+    _evict_shared_cache(shared_dir)
+
     if logger:
         logger(f"渲染完成: {video_path}")
         logger(f"分段视频数量: {len(section_videos)}")
-    
+
     return RenderResult(
         video_path=video_path,
         script_path=script_path,
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """主动式令牌桶限流器
+
+    在请求发出前按估算 token 数预扣容量，把请求速率压在账户
+    RPM/TPM 上限之下，避免被动吃 429 再指数退避浪费墙钟时间。
+    容量按分钟速率匀速补充，acquire 在容量不足时休眠等待。
+    """
+
+    def __init__(self, rate_per_min: float) -> None:
+        if rate_per_min <= 0:
+            raise ValueError("rate_per_min 必须为正数")
+        self._rate_per_sec = rate_per_min / 60.0
+        self._capacity = float(rate_per_min)
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate_per_sec)
+
+    def _try_acquire(self, tokens: float) -> float:
+        """尝试扣减，成功返回 0，否则返回需等待的秒数"""
+        tokens = min(tokens, self._capacity)
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self._rate_per_sec
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """阻塞直到容量足够"""
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """异步等待直到容量足够，不阻塞事件循环"""
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+def estimate_tokens(*texts: str) -> float:
+    """粗略估算 token 数（约 4 字符 / token）"""
+    return max(sum(len(text) for text in texts) / 4.0, 1.0)
@@ -1,11 +1,28 @@
 from __future__ import annotations
 
+import os
+import re
+import shutil
+import sys
+import time
+from collections import deque
 from dataclasses import dataclass
-from datetime import datetime
 from pathlib import Path
 
-from PySide6.QtCore import Qt, QUrl
-from PySide6.QtGui import QAction, QImage, QPixmap, QFont
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QEvent,
+    QModelIndex,
+    QObject,
+    QRunnable,
+    QSize,
+    Qt,
+    QThreadPool,
+    QTimer,
+    QUrl,
+    Signal,
+)
+from PySide6.QtGui import QAction, QColor, QImage, QPixmap, QFont, QFontMetrics, QPen
 from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
 from PySide6.QtMultimediaWidgets import QVideoWidget
 from PySide6.QtWidgets import (
@@ -18,8 +35,7 @@ from PySide6.QtWidgets import (
     QInputDialog,
     QLabel,
     QLineEdit,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QMainWindow,
     QMessageBox,
     QPushButton,
@@ -27,16 +43,36 @@ from PySide6.QtWidgets import (
     QSizePolicy,
     QSpinBox,
     QStackedLayout,
+    QStackedWidget,
     QStatusBar,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionButton,
     QVBoxLayout,
     QWidget,
     QTabWidget,
     QScrollArea,
 )
 
-from app.config import AISettings, RenderSettings
-from app.database import Database, Segment
-from app.workers import RenderWorker, start_worker, TaskResult
+from app.config import (
+    AISettings,
+    RenderSettings,
+    DEFAULT_WIDTH,
+    DEFAULT_HEIGHT,
+    DEFAULT_FPS,
+    DEFAULT_QUALITY,
+    DEFAULT_DEEPSEEK_BASE_URL,
+    DEFAULT_DEEPSEEK_MODEL,
+    DEFAULT_GEMINI_MODEL,
+)
+from app.database import Database, Segment, SegmentMeta
+from app.workers import (
+    RenderJob,
+    RenderWorker,
+    ensure_background_warmup,
+    start_worker_thread,
+    TaskResult,
+)
 
 
 @dataclass
@@ -45,64 +81,169 @@ class UiState:
     current_video: Path | None = None
 
 
-class Theme:
-    """主题配色 - 参考 IntelliJ IDEA 新UI设计（夜间模式）"""
-    
-    # 配色方案
-    COLORS = {
-        'bg_primary': '#1e1f22',
-        'bg_secondary': '#2b2d30',
-        'bg_tertiary': '#313335',
-        'bg_editor': '#1e1f22',
-        'bg_hover': '#2d2f32',
-        'border': '#3e4245',
-        'border_light': '#545659',
-        'text_primary': '#bcbec4',
-        'text_secondary': '#868a91',
-        'text_disabled': '#5f6368',
-        'accent': '#3574f0',
-        'accent_hover': '#4f8cf5',
-        'accent_pressed': '#2264dc',
-        'button_default': '#3e4245',
-        'button_disabled': '#303236',
-        'title_bar': '#2b2d30',
-    }
-    
-    @classmethod
-    def get_stylesheet(cls) -> str:
-        theme = cls.COLORS
-        return f"""
+# 界面显示名 -> 内部模式标识；模块级常量，避免每次点击生成都重建字典
+AI_MODE_MAP = {"DeepSeek": "deepseek", "Gemini": "gemini"}
+# 各模式必填的模型字段及其显示名，用于提交前校验
+_REQUIRED_MODELS = {
+    "deepseek": ("DeepSeek", lambda s: s.deepseek_model),
+    "gemini": ("Gemini", lambda s: s.gemini_model),
+}
+
+# 日志时间戳精度为 1 秒：同一秒内的多条日志复用上次格式化结果
+_last_log_ts: tuple[int, str] = (-1, "")
+
+
+def _log_timestamp() -> str:
+    global _last_log_ts
+    sec = int(time.time())
+    if sec != _last_log_ts[0]:
+        _last_log_ts = (sec, time.strftime("%H:%M:%S", time.localtime(sec)))
+    return _last_log_ts[1]
+
+
+class _FrameRelay(QObject):
+    """线程池转换结果回 GUI 线程的信号载体（QRunnable 自身不能带信号）"""
+    converted = Signal(QImage)
+
+
+# 定格帧缓存文件后缀；每个目录最多保留的定格帧数量
+_LASTFRAME_SUFFIX = ".lastframe.png"
+_LASTFRAME_CACHE_CAP = 32
+
+
+def _lastframe_path(video_path: Path) -> Path:
+    return video_path.with_name(video_path.name + _LASTFRAME_SUFFIX)
+
+
+class _SaveFrameTask(QRunnable):
+    """把定格帧落盘为视频旁的 PNG，并按数量淘汰目录内最旧的缓存
+
+    下次播完同一视频时直接从磁盘读回，省掉 UI 线程上
+    整帧 ARGB 的 toImage + 拷贝。
+    """
+
+    def __init__(self, image: QImage, video_path: Path) -> None:
+        super().__init__()
+        self._image = image
+        self._video_path = video_path
+
+    def run(self) -> None:
+        target = _lastframe_path(self._video_path)
+        try:
+            self._image.save(str(target), "PNG")
+            cached = sorted(
+                self._video_path.parent.glob(f"*{_LASTFRAME_SUFFIX}"),
+                key=lambda p: p.stat().st_mtime,
+            )
+            for stale in cached[:-_LASTFRAME_CACHE_CAP]:
+                stale.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+class _RmTreeRelay(QObject):
+    """后台删除结果回 GUI 线程的信号载体，错误为空串表示成功"""
+    finished = Signal(str, str)
+
+
+class _StatRelay(QObject):
+    """路径存在性检查结果回 GUI 线程的信号载体"""
+    checked = Signal(str, bool)
+
+
+class _PathCheckTask(QRunnable):
+    """在线程池中做 stat：网络/FUSE 挂载上同步 exists 可能卡 UI 数十毫秒"""
+
+    def __init__(self, path: Path, relay: _StatRelay) -> None:
+        super().__init__()
+        self._path = path
+        self._relay = relay
+
+    def run(self) -> None:
+        self._relay.checked.emit(str(self._path), self._path.exists())
+
+
+class _RmTreeTask(QRunnable):
+    """在线程池中删除目录树
+
+    工作区目录可能堆积数百 MB 的 MP4 与部分帧 PNG，
+    同步 rmtree 会让 GUI 线程卡顿数秒。
+    """
+
+    def __init__(self, path: Path, relay: _RmTreeRelay) -> None:
+        super().__init__()
+        self._path = path
+        self._relay = relay
+
+    def run(self) -> None:
+        try:
+            if self._path.exists():
+                shutil.rmtree(self._path)
+        except OSError as exc:
+            self._relay.finished.emit(self._path.name, str(exc))
+            return
+        self._relay.finished.emit(self._path.name, "")
+
+
+class _FrameConversionTask(QRunnable):
+    """在工作线程中把视频帧转为缩放后的 QImage
+
+    toImage() 在 1080p 下每帧分配约 8MB 并占用数毫秒，放在 GUI 线程
+    会和绘制抢时间；这里转换 + 按目标尺寸降采样后再发回主线程。
+    """
+
+    def __init__(self, frame, target_size: QSize, relay: _FrameRelay) -> None:
+        super().__init__()
+        self._frame = frame
+        self._target_size = target_size
+        self._relay = relay
+
+    def run(self) -> None:
+        # 无论成败都要发信号，主线程依赖它清理在飞标记
+        image = self._frame.toImage()
+        target = self._target_size
+        if not image.isNull() and target.width() > 0 and target.height() > 0:
+            image = image.scaled(
+                target,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.FastTransformation,
+            )
+        self._relay.converted.emit(image)
+
+
+# QSS 模板：CPython 只在导入时解析一次，颜色用 format_map 代入
+_QSS_TEMPLATE = """
         QMainWindow {{
-            background-color: {theme['bg_primary']};
-            color: {theme['text_primary']};
+            background-color: {bg_primary};
+            color: {text_primary};
         }}
         
         QWidget {{
-            background-color: {theme['bg_primary']};
-            color: {theme['text_primary']};
+            background-color: {bg_primary};
+            color: {text_primary};
             font-size: 13px;
         }}
         
         QGroupBox {{
-            color: {theme['text_primary']};
-            border: 1px solid {theme['border']};
+            color: {text_primary};
+            border: 1px solid {border};
             border-radius: 8px;
             margin-top: 12px;
             padding: 12px;
             font-weight: 600;
             font-size: 12px;
-            background-color: {theme['bg_secondary']};
+            background-color: {bg_secondary};
         }}
         
         QGroupBox::title {{
             subcontrol-origin: margin;
             left: 10px;
             padding: 0 8px;
-            background-color: {theme['bg_secondary']};
+            background-color: {bg_secondary};
         }}
         
         QPushButton {{
-            background-color: {theme['accent']};
+            background-color: {accent};
             color: white;
             border: none;
             border-radius: 6px;
@@ -113,52 +254,52 @@ class Theme:
         }}
         
         QPushButton:hover {{
-            background-color: {theme['accent_hover']};
+            background-color: {accent_hover};
         }}
         
         QPushButton:pressed {{
-            background-color: {theme['accent_pressed']};
+            background-color: {accent_pressed};
         }}
         
         QPushButton:disabled {{
-            background-color: {theme['button_disabled']};
-            color: {theme['text_disabled']};
+            background-color: {button_disabled};
+            color: {text_disabled};
         }}
         
         QLineEdit, QPlainTextEdit, QSpinBox {{
-            background-color: {theme['bg_editor']};
-            color: {theme['text_primary']};
-            border: 1px solid {theme['border']};
+            background-color: {bg_editor};
+            color: {text_primary};
+            border: 1px solid {border};
             border-radius: 6px;
             padding: 6px 10px;
-            selection-background-color: {theme['accent']};
+            selection-background-color: {accent};
             selection-color: white;
         }}
         
         QLineEdit:focus, QPlainTextEdit:focus, QSpinBox:focus {{
-            border: 1px solid {theme['accent']};
+            border: 1px solid {accent};
             outline: none;
         }}
         
         QLineEdit:hover, QPlainTextEdit:hover, QSpinBox:hover {{
-            border: 1px solid {theme['border_light']};
+            border: 1px solid {border_light};
         }}
         
         QComboBox {{
-            background-color: {theme['bg_editor']};
-            color: {theme['text_primary']};
-            border: 1px solid {theme['border']};
+            background-color: {bg_editor};
+            color: {text_primary};
+            border: 1px solid {border};
             border-radius: 6px;
             padding: 5px 10px;
             min-height: 24px;
         }}
         
         QComboBox:hover {{
-            border: 1px solid {theme['border_light']};
+            border: 1px solid {border_light};
         }}
         
         QComboBox:focus {{
-            border: 1px solid {theme['accent']};
+            border: 1px solid {accent};
         }}
         
         QComboBox::drop-down {{
@@ -172,24 +313,24 @@ class Theme:
         }}
         
         QComboBox QAbstractItemView {{
-            background-color: {theme['bg_secondary']};
-            color: {theme['text_primary']};
-            border: 1px solid {theme['border']};
+            background-color: {bg_secondary};
+            color: {text_primary};
+            border: 1px solid {border};
             border-radius: 6px;
-            selection-background-color: {theme['accent']};
+            selection-background-color: {accent};
             selection-color: white;
             outline: none;
         }}
         
         QLabel {{
-            color: {theme['text_secondary']};
+            color: {text_secondary};
             background-color: transparent;
         }}
         
         QListWidget {{
-            background-color: {theme['bg_secondary']};
-            color: {theme['text_primary']};
-            border: 1px solid {theme['border']};
+            background-color: {bg_secondary};
+            color: {text_primary};
+            border: 1px solid {border};
             border-radius: 8px;
             padding: 4px;
             outline: none;
@@ -197,34 +338,34 @@ class Theme:
         
         QListWidget::item {{
             padding: 12px;
-            background-color: {theme['bg_editor']};
+            background-color: {bg_editor};
             margin-bottom: 6px;
             border-radius: 6px;
             border: 1px solid transparent;
         }}
         
         QListWidget::item:hover {{
-            background-color: {theme['bg_hover']};
-            border: 1px solid {theme['border_light']};
+            background-color: {bg_hover};
+            border: 1px solid {border_light};
         }}
         
         QListWidget::item:selected {{
-            background-color: {theme['bg_editor']};
-            border: 1px solid {theme['accent']};
-            color: {theme['text_primary']};
+            background-color: {bg_editor};
+            border: 1px solid {accent};
+            color: {text_primary};
         }}
         
         QStatusBar {{
-            background-color: {theme['bg_secondary']};
-            color: {theme['text_secondary']};
-            border-top: 1px solid {theme['border']};
+            background-color: {bg_secondary};
+            color: {text_secondary};
+            border-top: 1px solid {border};
             padding: 4px 8px;
         }}
         
         QMenuBar {{
-            background-color: {theme['title_bar']};
-            color: {theme['text_primary']};
-            border-bottom: 1px solid {theme['border']};
+            background-color: {title_bar};
+            color: {text_primary};
+            border-bottom: 1px solid {border};
             padding: 2px;
             spacing: 2px;
         }}
@@ -236,18 +377,18 @@ class Theme:
         }}
         
         QMenuBar::item:selected {{
-            background-color: {theme['bg_hover']};
+            background-color: {bg_hover};
         }}
         
         QMenuBar::item:pressed {{
-            background-color: {theme['accent']};
+            background-color: {accent};
             color: white;
         }}
         
         QMenu {{
-            background-color: {theme['bg_secondary']};
-            color: {theme['text_primary']};
-            border: 1px solid {theme['border']};
+            background-color: {bg_secondary};
+            color: {text_primary};
+            border: 1px solid {border};
             border-radius: 8px;
             padding: 4px;
         }}
@@ -258,13 +399,13 @@ class Theme:
         }}
         
         QMenu::item:selected {{
-            background-color: {theme['accent']};
+            background-color: {accent};
             color: white;
         }}
         
         QMenu::separator {{
             height: 1px;
-            background-color: {theme['border']};
+            background-color: {border};
             margin: 4px 0;
         }}
         
@@ -276,14 +417,14 @@ class Theme:
         }}
         
         QScrollBar::handle:vertical {{
-            background-color: {theme['border_light']};
+            background-color: {border_light};
             border-radius: 6px;
             min-height: 30px;
             margin: 2px;
         }}
         
         QScrollBar::handle:vertical:hover {{
-            background-color: {theme['border']};
+            background-color: {border};
         }}
         
         QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
@@ -303,14 +444,14 @@ class Theme:
         }}
         
         QScrollBar::handle:horizontal {{
-            background-color: {theme['border_light']};
+            background-color: {border_light};
             border-radius: 6px;
             min-width: 30px;
             margin: 2px;
         }}
         
         QScrollBar::handle:horizontal:hover {{
-            background-color: {theme['border']};
+            background-color: {border};
         }}
         
         QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{
@@ -333,7 +474,7 @@ class Theme:
         
         QTabBar::tab {{
             background-color: transparent;
-            color: {theme['text_secondary']};
+            color: {text_secondary};
             padding: 8px 16px;
             margin-right: 4px;
             border: none;
@@ -342,14 +483,14 @@ class Theme:
         }}
         
         QTabBar::tab:hover {{
-            color: {theme['text_primary']};
-            background-color: {theme['bg_hover']};
+            color: {text_primary};
+            background-color: {bg_hover};
             border-radius: 6px 6px 0 0;
         }}
         
         QTabBar::tab:selected {{
-            color: {theme['accent']};
-            border-bottom: 2px solid {theme['accent']};
+            color: {accent};
+            border-bottom: 2px solid {accent};
         }}
         
         QScrollArea {{
@@ -364,15 +505,280 @@ class Theme:
         }}
         
         QSpinBox::up-button:hover, QSpinBox::down-button:hover {{
-            background-color: {theme['bg_hover']};
+            background-color: {bg_hover};
         }}
         """
+
+# 模板在导入时按空行切成单条规则；各片段独立 format 后 join，
+# 避免一次性格式化数百行大字符串的峰值临时分配
+_QSS_RULE_TEMPLATES: tuple[str, ...] = tuple(
+    part.strip() for part in re.split(r"\n\s*\n", _QSS_TEMPLATE) if part.strip()
+)
+
+
+class Theme:
+    """主题配色 - 参考 IntelliJ IDEA 新UI设计（夜间模式）"""
+    
+    # 配色方案
+    COLORS = {
+        'bg_primary': '#1e1f22',
+        'bg_secondary': '#2b2d30',
+        'bg_tertiary': '#313335',
+        'bg_editor': '#1e1f22',
+        'bg_hover': '#2d2f32',
+        'border': '#3e4245',
+        'border_light': '#545659',
+        'text_primary': '#bcbec4',
+        'text_secondary': '#868a91',
+        'text_disabled': '#5f6368',
+        'accent': '#3574f0',
+        'accent_hover': '#4f8cf5',
+        'accent_pressed': '#2264dc',
+        'button_default': '#3e4245',
+        'button_disabled': '#303236',
+        'title_bar': '#2b2d30',
+    }
     
+    # 面板内控件的规则单独下发到面板根部，全局表只保留窗口级样式，
+    # 这样 Qt 每次 polish 时要匹配的选择器数量大幅减少
+    _CONTROL_CLASSES = (
+        "QPushButton",
+        "QLineEdit",
+        "QPlainTextEdit",
+        "QSpinBox",
+        "QComboBox",
+        "QGroupBox",
+        "QListWidget",
+    )
+
+    _cached_qss: str | None = None
+    _split_cache: tuple[str, str] | None = None
+
+    # 预构建的字体与零散样式片段（_prepare 填充，构建控件时直接复用）
+    TITLE_FONT: QFont | None = None
+    GEN_BUTTON_FONT: QFont | None = None
+    CONSOLE_FONT: QFont | None = None
+    TITLE_LABEL_QSS: str = ""
+
+    @classmethod
+    def _prepare(cls) -> None:
+        """一次性构建复用对象，避免每次建控件时重建 QFont/样式串"""
+        title_font = QFont()
+        title_font.setPointSize(20)
+        title_font.setWeight(QFont.Weight.Bold)
+        cls.TITLE_FONT = title_font
+
+        gen_font = QFont()
+        gen_font.setPointSize(13)
+        gen_font.setWeight(QFont.Weight.Medium)
+        cls.GEN_BUTTON_FONT = gen_font
+
+        cls.CONSOLE_FONT = QFont("Consolas, Courier New, monospace", 10)
+        cls.TITLE_LABEL_QSS = (
+            f"color: {cls.COLORS['text_primary']}; padding-bottom: 8px;"
+        )
+
+    _formatted_rules: tuple[str, ...] | None = None
+
+    @classmethod
+    def _rules(cls) -> tuple[str, ...]:
+        """逐条代入颜色后的规则串（只格式化一次）"""
+        if cls._formatted_rules is None:
+            colors = cls.COLORS
+            cls._formatted_rules = tuple(
+                template.format_map(colors) for template in _QSS_RULE_TEMPLATES
+            )
+        return cls._formatted_rules
+
+    @classmethod
+    def get_stylesheet(cls) -> str:
+        """构建（并缓存）完整样式表：输出只依赖类常量 COLORS
+
+        保留排版的版本仅供调试查看；下发给 Qt 的是压缩版。
+        """
+        if cls._cached_qss is None:
+            cls._cached_qss = sys.intern("\n".join(cls._rules()))
+        return cls._cached_qss
+
+    @staticmethod
+    def _minify(qss: str) -> str:
+        """去掉缩进与多余空白：约四成字符是纯排版
+
+        Qt 的 QSS 词法器逐字符扫描传入的样式表，每个控件还会
+        缓存一份字符串，压缩后解析更快、驻留内存更小。
+        """
+        qss = re.sub(r"\s+", " ", qss)
+        return re.sub(r"\s*([:;{},])\s*", r"\1", qss).strip()
+
+    @classmethod
+    def _split_stylesheet(cls) -> tuple[str, str]:
+        """把规则按控件类分桶成压缩后的（全局窗口表, 控件表），只做一次"""
+        if cls._split_cache is None:
+            chrome: list[str] = []
+            controls: list[str] = []
+            for rule in cls._rules():
+                name = re.match(r"(\w+)", rule)
+                bucket = (
+                    controls
+                    if name and name.group(1) in cls._CONTROL_CLASSES
+                    else chrome
+                )
+                bucket.append(cls._minify(rule))
+            cls._split_cache = ("".join(chrome), "".join(controls))
+        return cls._split_cache
+
+    @classmethod
+    def panel_stylesheet(cls, object_name: str, background: str) -> str:
+        """面板根部样式：控件规则 + 面板自身背景（ID 选择器只命中面板）"""
+        controls = cls._split_stylesheet()[1]
+        return f"{controls}\n#{object_name} {{ background-color: {background}; }}"
+
     @classmethod
     def apply(cls, app: QApplication) -> None:
         """\u5e94\u7528\u591c\u95f4\u4e3b\u9898"""
         app.setStyle("Fusion")
-        app.setStyleSheet(cls.get_stylesheet())
+        app.setStyleSheet(cls._split_stylesheet()[0])
+        cls._prepare()
+
+
+class SegmentListModel(QAbstractListModel):
+    """分段历史的列表模型：数据与控件分离，活动控件数与分段数无关"""
+
+    SegmentRole = Qt.ItemDataRole.UserRole
+    PlayableRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._segments: list[SegmentMeta] = []
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(self._segments)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self._segments)):
+            return None
+        segment = self._segments[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return segment.input_text
+        if role == self.SegmentRole:
+            return segment
+        if role == self.PlayableRole:
+            return bool(segment.section_video_path)
+        return None
+
+    def reset_segments(self, segments: list[SegmentMeta]) -> None:
+        self.beginResetModel()
+        self._segments = list(segments)
+        self.endResetModel()
+
+    def insert_top(self, segment: SegmentMeta) -> None:
+        """在列表头部插入单个分段（列表按 segment_index 降序）"""
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._segments.insert(0, segment)
+        self.endInsertRows()
+
+    def update_segment(self, segment: SegmentMeta) -> None:
+        """按 id 替换已有分段并只刷新对应行"""
+        for row, existing in enumerate(self._segments):
+            if existing.id == segment.id:
+                self._segments[row] = segment
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+                return
+
+
+class SegmentItemDelegate(QStyledItemDelegate):
+    """绘制单个分段行（标题 + 省略的描述 + 播放按钮热区）"""
+
+    play_requested = Signal(object)
+
+    ROW_HEIGHT = 84
+    BUTTON_SIZE = QSize(72, 30)
+    PADDING = 16
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        # paint 每行每帧都会调用：画刷/画笔/颜色一次性构建后复用
+        self._bg_brush = QColor(Theme.COLORS['bg_editor'])
+        self._bg_hover_brush = QColor(Theme.COLORS['bg_hover'])
+        self._pen_default = QPen(QColor(Qt.GlobalColor.transparent), 1)
+        self._pen_selected = QPen(QColor(Theme.COLORS['accent']), 1)
+        self._pen_hover = QPen(QColor(Theme.COLORS['border_light']), 1)
+        self._title_pen = QPen(QColor(Theme.COLORS['text_primary']))
+        self._desc_pen = QPen(QColor(Theme.COLORS['text_secondary']))
+        self._title_font: QFont | None = None
+
+    def sizeHint(self, option, index) -> QSize:  # noqa: N802
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index) -> None:
+        segment: SegmentMeta = index.data(SegmentListModel.SegmentRole)
+        if segment is None:
+            return
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+
+        rect = option.rect.adjusted(4, 3, -4, -3)
+        background = self._bg_brush
+        pen = self._pen_default
+        if option.state & QStyle.StateFlag.State_Selected:
+            pen = self._pen_selected
+        elif option.state & QStyle.StateFlag.State_MouseOver:
+            background = self._bg_hover_brush
+            pen = self._pen_hover
+        painter.setPen(pen)
+        painter.setBrush(background)
+        painter.drawRoundedRect(rect, 6, 6)
+
+        text_left = rect.left() + self.PADDING
+        text_width = rect.width() - 2 * self.PADDING - self.BUTTON_SIZE.width() - 8
+
+        if self._title_font is None:
+            self._title_font = QFont(option.font)
+            self._title_font.setBold(True)
+        painter.setFont(self._title_font)
+        painter.setPen(self._title_pen)
+        painter.drawText(text_left, rect.top() + 26, f"分段 #{segment.segment_index}")
+
+        # 用字体度量做省略，正确处理宽字符，替代手写的 [:100] 截断
+        painter.setFont(option.font)
+        painter.setPen(self._desc_pen)
+        metrics = QFontMetrics(option.font)
+        elided = metrics.elidedText(
+            segment.input_text.replace("\n", " "),
+            Qt.TextElideMode.ElideRight,
+            max(text_width, 0),
+        )
+        painter.drawText(text_left, rect.top() + 50, elided)
+
+        if index.data(SegmentListModel.PlayableRole):
+            button = QStyleOptionButton()
+            button.rect = self._play_button_rect(rect)
+            button.text = "播放"
+            button.state = QStyle.StateFlag.State_Enabled
+            QApplication.style().drawControl(
+                QStyle.ControlElement.CE_PushButton, button, painter
+            )
+        painter.restore()
+
+    def _play_button_rect(self, rect):
+        return rect.adjusted(
+            rect.width() - self.PADDING - self.BUTTON_SIZE.width(),
+            (rect.height() - self.BUTTON_SIZE.height()) // 2,
+            -self.PADDING,
+            -(rect.height() - self.BUTTON_SIZE.height()) // 2,
+        )
+
+    def editorEvent(self, event, model, option, index) -> bool:  # noqa: N802
+        if (
+            event.type() == QEvent.Type.MouseButtonRelease
+            and index.data(SegmentListModel.PlayableRole)
+        ):
+            rect = option.rect.adjusted(4, 3, -4, -3)
+            if self._play_button_rect(rect).contains(event.position().toPoint()):
+                self.play_requested.emit(index.data(SegmentListModel.SegmentRole))
+                return True
+        return super().editorEvent(event, model, option, index)
 
 
 class PlayerWidget(QWidget):
@@ -384,6 +790,15 @@ class PlayerWidget(QWidget):
         self.still_label.setStyleSheet("background: black;")
         self.still_label.hide()
         self._last_frame: QImage | None = None
+        # fromImage 只在新帧到来时做一次；缩放结果按（目标尺寸, 是否平滑）缓存，
+        # 连续 resize 事件不再对同一几何重复缩放
+        self._last_pixmap: QPixmap | None = None
+        self._scaled_cache: tuple[QSize, bool, QPixmap] | None = None
+        # 拖拽缩放期间用快速缩放，停止 150ms 后再补一次平滑缩放
+        self._smooth_timer = QTimer(self)
+        self._smooth_timer.setSingleShot(True)
+        self._smooth_timer.setInterval(150)
+        self._smooth_timer.timeout.connect(self._rescale_smooth)
 
         self.layout = QStackedLayout(self)
         self.layout.setContentsMargins(0, 0, 0, 0)
@@ -393,6 +808,8 @@ class PlayerWidget(QWidget):
 
     def show_last_frame(self, image: QImage) -> None:
         self._last_frame = image
+        self._last_pixmap = QPixmap.fromImage(image)
+        self._scaled_cache = None
         self._update_still_pixmap()
         self.layout.setCurrentWidget(self.still_label)
         self.still_label.show()
@@ -403,26 +820,39 @@ class PlayerWidget(QWidget):
 
     def resizeEvent(self, event) -> None:  # noqa: N802
         super().resizeEvent(event)
-        if self.still_label.isVisible() and self._last_frame is not None:
-            self._update_still_pixmap()
+        if self.still_label.isVisible() and self._last_pixmap is not None:
+            self._update_still_pixmap(smooth=False)
+            self._smooth_timer.start()
 
-    def _update_still_pixmap(self) -> None:
-        if self._last_frame is None:
-            return
-        pixmap = QPixmap.fromImage(self._last_frame)
-        if pixmap.isNull():
+    def _rescale_smooth(self) -> None:
+        if self.still_label.isVisible() and self._last_pixmap is not None:
+            self._update_still_pixmap(smooth=True)
+
+    def _update_still_pixmap(self, smooth: bool = True) -> None:
+        pixmap = self._last_pixmap
+        if pixmap is None or pixmap.isNull():
             return
         target = self.video_widget.size()
         if target.width() > 0 and target.height() > 0:
+            cached = self._scaled_cache
+            if cached is not None and cached[0] == target and cached[1] >= smooth:
+                self.still_label.setPixmap(cached[2])
+                return
             pixmap = pixmap.scaled(
                 target,
                 Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
+                Qt.TransformationMode.SmoothTransformation
+                if smooth
+                else Qt.TransformationMode.FastTransformation,
             )
+            self._scaled_cache = (QSize(target), smooth, pixmap)
         self.still_label.setPixmap(pixmap)
 
 
 class MainWindow(QMainWindow):
+    # 经队列连接把任务投递到常驻工作线程
+    job_requested = Signal(object)
+
     def __init__(self, db: Database, jobs_dir: Path) -> None:
         super().__init__()
         self.setWindowTitle("Manimai")
@@ -431,16 +861,53 @@ class MainWindow(QMainWindow):
         self._db = db
         self._jobs_dir = jobs_dir
         self._ui_state = UiState()
-        self._worker_thread = None
-        self._current_worker = None
+        # 常驻渲染线程：任务经 job_requested 投递，线程跨任务复用，
+        # 模块级 HTTP 连接池与缓存随线程保持热态
+        self._render_worker = RenderWorker()
+        self._render_worker.started.connect(self._on_task_started)
+        self._render_worker.progress.connect(self._on_worker_progress)
+        self._render_worker.finished.connect(self._on_finished)
+        self._render_worker.failed.connect(self._on_failed)
+        self.job_requested.connect(self._render_worker.run_job)
+        self._worker_thread = start_worker_thread(self._render_worker)
+        self._task_running = False
         self._play_queue: list[Path] = []
         self._active_workspace = self._db.get_setting("active_workspace", "default")
         self._active_job_dir = self._jobs_dir / self._active_workspace
         self._current_segment: Segment | None = None
+        # 每工作区的分段元信息缓存：新增/更新走单行增量路径，
+        # 只有删除类操作才重新查询 SQLite
+        self._segments_cache: dict[str, list[SegmentMeta]] = {}
+        # 工作区目录列表缓存，键为 jobs 目录 mtime
+        self._workspaces_cache: tuple[float, list[str]] | None = None
         self._playback_active = False
+        # 设置/控制台选项卡按需构建；控制台未创建前日志先入缓冲
+        self._settings_built = False
+        self._console_built = False
+        self._log_buffer: deque[str] = deque(maxlen=1000)
+        # 帧转换走全局线程池；relay 信号自工作线程发出，
+        # Qt 自动按队列连接投递回 GUI 线程
+        self._frame_pool = QThreadPool.globalInstance()
+        self._frame_relay = _FrameRelay(self)
+        self._frame_relay.converted.connect(self._on_frame_converted)
+        self._last_frame_ts = 0.0
+        self._frame_inflight = False
+        self._pending_frame = None
+        self._expected_source_url = QUrl()
+        self._rmtree_relay = _RmTreeRelay(self)
+        self._rmtree_relay.finished.connect(self._on_rmtree_finished)
+        self._stat_relay = _StatRelay(self)
+        self._stat_relay.checked.connect(self._on_play_path_checked)
+        # 等待存在性检查的待播分段：路径 -> 分段索引
+        self._pending_play: dict[str, int] = {}
+        # 渲染进度合批刷新：50ms 窗口内的进度行只触发一次控制台追加
+        self._progress_lines: deque[str] = deque()
+        self._progress_flush_timer = QTimer(self)
+        self._progress_flush_timer.setSingleShot(True)
+        self._progress_flush_timer.setInterval(50)
+        self._progress_flush_timer.timeout.connect(self._flush_worker_progress)
 
         self._build_ui()
-        self._load_settings()
         self._load_history()
 
     def _build_ui(self) -> None:
@@ -468,18 +935,16 @@ class MainWindow(QMainWindow):
     def _build_left_panel(self) -> QWidget:
         """构建左侧面板：输入和播放器"""
         widget = QWidget()
-        widget.setStyleSheet(f"background-color: {Theme.COLORS['bg_primary']};")
+        widget.setObjectName("leftPanel")
+        widget.setStyleSheet(Theme.panel_stylesheet("leftPanel", Theme.COLORS['bg_primary']))
         layout = QVBoxLayout(widget)
         layout.setContentsMargins(16, 16, 8, 16)
         layout.setSpacing(16)
 
         # 标题
         title = QLabel("动画生成")
-        title_font = QFont()
-        title_font.setPointSize(20)
-        title_font.setWeight(QFont.Weight.Bold)
-        title.setFont(title_font)
-        title.setStyleSheet(f"color: {Theme.COLORS['text_primary']}; padding-bottom: 8px;")
+        title.setFont(Theme.TITLE_FONT)
+        title.setStyleSheet(Theme.TITLE_LABEL_QSS)
         layout.addWidget(title)
 
         # 输入区
@@ -508,10 +973,7 @@ class MainWindow(QMainWindow):
         self.generate_btn = QPushButton("生成并播放")
         self.generate_btn.setMinimumHeight(36)
         self.generate_btn.clicked.connect(self._on_generate)
-        gen_font = QFont()
-        gen_font.setPointSize(13)
-        gen_font.setWeight(QFont.Weight.Medium)
-        self.generate_btn.setFont(gen_font)
+        self.generate_btn.setFont(Theme.GEN_BUTTON_FONT)
         layout.addWidget(self.generate_btn)
 
         return group
@@ -531,40 +993,81 @@ class MainWindow(QMainWindow):
     def _build_right_panel(self) -> QWidget:
         """构建右侧面板：选项卡"""
         widget = QWidget()
-        widget.setStyleSheet(f"background-color: {Theme.COLORS['bg_secondary']};")
+        widget.setObjectName("rightPanel")
+        widget.setStyleSheet(Theme.panel_stylesheet("rightPanel", Theme.COLORS['bg_secondary']))
         layout = QVBoxLayout(widget)
         layout.setContentsMargins(8, 16, 16, 16)
         layout.setSpacing(0)
 
-        # 使用选项卡来组织内容
-        tabs = QTabWidget()
+        # 使用选项卡来组织内容；设置/控制台用占位符延迟构建，
+        # 首屏只需实例化历史列表
+        self.tabs = QTabWidget()
 
         # 历史选项卡
         history_widget = self._build_history_tab()
-        tabs.addTab(history_widget, "分段历史")
+        self.tabs.addTab(history_widget, "分段历史")
+
+        # 设置选项卡（占位）
+        self._settings_placeholder = QWidget()
+        self.tabs.addTab(self._settings_placeholder, "设置")
 
-        # 设置选项卡
-        settings_widget = self._build_settings_tab()
-        tabs.addTab(settings_widget, "设置")
+        # 控制台选项卡（占位）
+        self._console_placeholder = QWidget()
+        self.tabs.addTab(self._console_placeholder, "控制台")
 
-        # 控制台选项卡
-        console_widget = self._build_console_tab()
-        tabs.addTab(console_widget, "控制台")
+        self.tabs.currentChanged.connect(self._on_tab_changed)
 
-        layout.addWidget(tabs)
+        layout.addWidget(self.tabs)
 
         return widget
 
+    def _on_tab_changed(self, index: int) -> None:
+        """首次切到设置/控制台时才构建其内容"""
+        if index == 1 and not self._settings_built:
+            self._mount_placeholder(self._settings_placeholder, self._build_settings_tab())
+            self._settings_built = True
+            self._load_settings()
+        elif index == 2 and not self._console_built:
+            self._mount_placeholder(self._console_placeholder, self._build_console_tab())
+            self._console_built = True
+            # 回放构建前缓冲的日志
+            while self._log_buffer:
+                self.console_output.appendPlainText(self._log_buffer.popleft())
+
+    @staticmethod
+    def _mount_placeholder(placeholder: QWidget, content: QWidget) -> None:
+        layout = QVBoxLayout(placeholder)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(content)
+
     def _build_history_tab(self) -> QWidget:
         """构建历史选项卡"""
         widget = QWidget()
         layout = QVBoxLayout(widget)
         layout.setContentsMargins(12, 12, 12, 12)
 
-        self.history_list = QListWidget()
+        # 模型/委托绘制列表：活动控件只有 QListView 本身，
+        # 不再为每个分段创建一组子控件
+        self.history_model = SegmentListModel(self)
+        self._history_delegate = SegmentItemDelegate(self)
+        self._history_delegate.play_requested.connect(self._play_segment)
+
+        self.history_list = QListView()
+        self.history_list.setModel(self.history_model)
+        self.history_list.setItemDelegate(self._history_delegate)
         self.history_list.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.history_list.setMouseTracking(True)
+        # 行高固定：声明统一尺寸后视图只询问一次 sizeHint，
+        # 滚动范围计算从 O(N) 次委托调用降为 O(1)
+        self.history_list.setUniformItemSizes(True)
+        # QSS 里的 QListWidget 规则不再匹配，这里补上视图自身的底色
+        self.history_list.setStyleSheet(
+            "QListView {{ background-color: {bg_secondary}; "
+            "border: 1px solid {border}; border-radius: 8px; "
+            "padding: 4px; outline: none; }}".format(**Theme.COLORS)
+        )
         layout.addWidget(self.history_list)
-        
+
         return widget
 
     def _build_settings_tab(self) -> QWidget:
@@ -598,7 +1101,9 @@ class MainWindow(QMainWindow):
 
         self.console_output = QPlainTextEdit()
         self.console_output.setReadOnly(True)
-        self.console_output.setFont(QFont("Consolas, Courier New, monospace", 10))
+        # 限制文档块数：QTextDocument 无上限增长会让 appendPlainText 越来越慢
+        self.console_output.setMaximumBlockCount(2000)
+        self.console_output.setFont(Theme.CONSOLE_FONT)
         layout.addWidget(self.console_output)
         
         return widget
@@ -643,34 +1148,52 @@ class MainWindow(QMainWindow):
         self.ai_mode_input.addItems(["DeepSeek", "Gemini"])
         self.ai_mode_input.currentTextChanged.connect(self._on_ai_mode_changed)
 
+        # 两种模式的字段预先建好放入 QStackedWidget：
+        # 切换模式只换当前页（一次重排），不再逐控件 setVisible
+        self.ai_stack = QStackedWidget()
+        self.ai_stack.addWidget(self._build_deepseek_panel())
+        self.ai_stack.addWidget(self._build_gemini_panel())
+
+        layout.addRow("AI 模型", self.ai_mode_input)
+        layout.addRow(self.ai_stack)
+
+        self.save_settings_btn = QPushButton("保存配置")
+        self.save_settings_btn.clicked.connect(self._save_settings)
+        layout.addRow("", self.save_settings_btn)
+
+        return group
+
+    def _build_deepseek_panel(self) -> QWidget:
+        panel = QWidget()
+        layout = QFormLayout(panel)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setVerticalSpacing(12)
+        layout.setHorizontalSpacing(16)
+
         self.deepseek_key = QLineEdit()
         self.deepseek_key.setEchoMode(QLineEdit.EchoMode.Password)
         self.deepseek_base = QLineEdit()
         self.deepseek_model = QLineEdit()
 
+        layout.addRow("API Key", self.deepseek_key)
+        layout.addRow("API 地址", self.deepseek_base)
+        layout.addRow("模型名称", self.deepseek_model)
+        return panel
+
+    def _build_gemini_panel(self) -> QWidget:
+        panel = QWidget()
+        layout = QFormLayout(panel)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setVerticalSpacing(12)
+        layout.setHorizontalSpacing(16)
+
         self.gemini_key = QLineEdit()
         self.gemini_key.setEchoMode(QLineEdit.EchoMode.Password)
         self.gemini_model = QLineEdit()
 
-        self.deepseek_key_label = QLabel("API Key")
-        self.deepseek_base_label = QLabel("API 地址")
-        self.deepseek_model_label = QLabel("模型名称")
-        self.gemini_key_label = QLabel("API Key")
-        self.gemini_model_label = QLabel("模型名称")
-
-        layout.addRow("AI 模型", self.ai_mode_input)
-        layout.addRow("", QWidget())  # 分隔符
-        layout.addRow(self.deepseek_key_label, self.deepseek_key)
-        layout.addRow(self.deepseek_base_label, self.deepseek_base)
-        layout.addRow(self.deepseek_model_label, self.deepseek_model)
-        layout.addRow(self.gemini_key_label, self.gemini_key)
-        layout.addRow(self.gemini_model_label, self.gemini_model)
-
-        self.save_settings_btn = QPushButton("保存配置")
-        self.save_settings_btn.clicked.connect(self._save_settings)
-        layout.addRow("", self.save_settings_btn)
-
-        return group
+        layout.addRow("API Key", self.gemini_key)
+        layout.addRow("模型名称", self.gemini_model)
+        return panel
 
     def _build_menus(self) -> None:
         workspace_menu = self.menuBar().addMenu("工作区")
@@ -693,26 +1216,43 @@ class MainWindow(QMainWindow):
         self.player_backend.mediaStatusChanged.connect(self._on_media_status)
         video_sink = self.player.video_widget.videoSink()
         if video_sink is not None:
-            video_sink.videoFrameChanged.connect(self._on_video_frame)
+            # 队列连接：帧处理排入事件循环而不是在绘制回调里重入 Python
+            video_sink.videoFrameChanged.connect(
+                self._on_video_frame, Qt.ConnectionType.QueuedConnection
+            )
 
     def _on_ai_mode_changed(self, mode: str) -> None:
-        is_deepseek = mode == "DeepSeek"
-        self.deepseek_key_label.setVisible(is_deepseek)
-        self.deepseek_key.setVisible(is_deepseek)
-        self.deepseek_base_label.setVisible(is_deepseek)
-        self.deepseek_base.setVisible(is_deepseek)
-        self.deepseek_model_label.setVisible(is_deepseek)
-        self.deepseek_model.setVisible(is_deepseek)
-        
-        is_gemini = mode == "Gemini"
-        self.gemini_key_label.setVisible(is_gemini)
-        self.gemini_key.setVisible(is_gemini)
-        self.gemini_model_label.setVisible(is_gemini)
-        self.gemini_model.setVisible(is_gemini)
+        self.ai_stack.setCurrentIndex(0 if mode == "DeepSeek" else 1)
 
     def _log(self, message: str) -> None:
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.console_output.appendPlainText(f"[{timestamp}] {message}")
+        line = f"[{_log_timestamp()}] {message}"
+        if self._console_built:
+            self.console_output.appendPlainText(line)
+        else:
+            self._log_buffer.append(line)
+
+    def _on_worker_progress(self, message: str) -> None:
+        """渲染进度入缓冲，50ms 定时器合并刷新
+
+        工作线程已合批发送（一次信号可含多行）；接收侧再聚合一次，
+        整个窗口期只做一次控制台追加和一次状态栏更新。
+        """
+        self._progress_lines.extend(message.split("\n"))
+        if not self._progress_flush_timer.isActive():
+            self._progress_flush_timer.start()
+
+    def _flush_worker_progress(self) -> None:
+        if not self._progress_lines:
+            return
+        lines = list(self._progress_lines)
+        self._progress_lines.clear()
+        stamp = _log_timestamp()
+        block = "\n".join(f"[{stamp}] {line}" for line in lines)
+        if self._console_built:
+            self.console_output.appendPlainText(block)
+        else:
+            self._log_buffer.extend(block.split("\n"))
+        self.status.showMessage(lines[-1])
 
     def _create_workspace(self) -> None:
         name, ok = QInputDialog.getText(self, "新建工作区", "输入工作区名称")
@@ -735,9 +1275,14 @@ class MainWindow(QMainWindow):
         self._set_active_workspace(workspace)
 
     def _set_active_workspace(self, workspace: str) -> None:
+        # 真正切换时丢弃目标工作区的缓存，确保展示最新数据库内容
+        if workspace != self._active_workspace:
+            self._segments_cache.pop(workspace, None)
         self._active_workspace = workspace
         self._active_job_dir = self._jobs_dir / workspace
         self._active_job_dir.mkdir(parents=True, exist_ok=True)
+        # mkdir 可能新建目录，mtime 粒度较粗时显式失效更稳妥
+        self._workspaces_cache = None
         self._db.set_setting("active_workspace", workspace)
         self._load_history()
         self._log(f"已切换工作区: {workspace}")
@@ -762,50 +1307,88 @@ class MainWindow(QMainWindow):
         if reply != QMessageBox.StandardButton.Yes:
             return
 
-        import shutil
         workspace_dir = self._jobs_dir / workspace
         try:
-            if workspace_dir.exists():
-                shutil.rmtree(workspace_dir)
             self._db.delete_workspace_data(workspace)
-            self._log(f"已删除工作区: {workspace}")
-
-            # 如果删除的是当前工作区，需要切换到其他工作区或创建临时工作区
-            if workspace == self._active_workspace:
-                remaining = self._list_workspaces()
-                target_workspace = remaining[0] if remaining else "temp"
-                self._set_active_workspace(target_workspace)
-                message = f"当前工作区已删除，已切换到 '{target_workspace}'"
-                QMessageBox.information(self, "提示", message)
-
         except Exception as exc:  # noqa: BLE001
             QMessageBox.critical(self, "错误", f"删除工作区失败: {exc}")
             self._log(f"删除工作区失败: {exc}")
+            return
+
+        self._segments_cache.pop(workspace, None)
+        self._workspaces_cache = None
+        # 目录树可能有数百 MB 渲染产物：丢给线程池删，UI 不阻塞
+        self._log(f"正在后台删除工作区目录: {workspace}")
+        self._frame_pool.start(_RmTreeTask(workspace_dir, self._rmtree_relay))
+
+        # 如果删除的是当前工作区，需要切换到其他工作区或创建临时工作区
+        if workspace == self._active_workspace:
+            remaining = [w for w in self._list_workspaces() if w != workspace]
+            target_workspace = remaining[0] if remaining else "temp"
+            self._set_active_workspace(target_workspace)
+            message = f"当前工作区已删除，已切换到 '{target_workspace}'"
+            QMessageBox.information(self, "提示", message)
+
+    def _on_rmtree_finished(self, workspace: str, error: str) -> None:
+        self._workspaces_cache = None
+        if error:
+            self.status.showMessage(f"删除工作区目录失败: {workspace}", 5000)
+            self._log(f"删除工作区目录失败: {workspace}: {error}")
+        else:
+            self.status.showMessage(f"工作区已删除: {workspace}", 3000)
+            self._log(f"已删除工作区: {workspace}")
 
     def _list_workspaces(self) -> list[str]:
-        if not self._jobs_dir.exists():
+        """列出工作区目录（结果按 jobs 目录 mtime 记忆化）
+
+        scandir 的 DirEntry.is_dir 直接用 readdir 返回的类型信息，
+        不像 iterdir + is_dir 那样对每个条目再 stat 一次。
+        """
+        try:
+            mtime = self._jobs_dir.stat().st_mtime
+        except OSError:
             return []
-        return sorted(
+        cached = self._workspaces_cache
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with os.scandir(self._jobs_dir) as entries:
+            names = sorted(
+                entry.name
+                for entry in entries
+                if entry.is_dir(follow_symlinks=False)
+                and not entry.name.startswith(".")
+            )
+        self._workspaces_cache = (mtime, names)
+        return names
+
+    def _load_settings(self) -> None:
+        # 一次 IN 查询取回全部设置，避免 10 次独立的 SQL 往返
+        s = self._db.get_settings(
             [
-                item.name
-                for item in self._jobs_dir.iterdir()
-                if item.is_dir() and not item.name.startswith(".")
+                "width",
+                "height",
+                "fps",
+                "quality",
+                "ai_mode",
+                "deepseek_key",
+                "deepseek_base",
+                "deepseek_model",
+                "gemini_key",
+                "gemini_model",
             ]
         )
-
-    def _load_settings(self) -> None:
-        self.width_input.setValue(int(self._db.get_setting("width", "1920")))
-        self.height_input.setValue(int(self._db.get_setting("height", "1080")))
-        self.fps_input.setValue(int(self._db.get_setting("fps", "30")))
-        self.quality_input.setCurrentText(self._db.get_setting("quality", "k"))
-        self.ai_mode_input.setCurrentText(self._db.get_setting("ai_mode", "DeepSeek"))
-
-        self.deepseek_key.setText(self._db.get_setting("deepseek_key", ""))
-        self.deepseek_base.setText(self._db.get_setting("deepseek_base", "https://api.deepseek.com"))
-        self.deepseek_model.setText(self._db.get_setting("deepseek_model", "deepseek-chat"))
-
-        self.gemini_key.setText(self._db.get_setting("gemini_key", ""))
-        self.gemini_model.setText(self._db.get_setting("gemini_model", "gemini-1.5-flash"))
+        self.width_input.setValue(int(s.get("width", str(DEFAULT_WIDTH))))
+        self.height_input.setValue(int(s.get("height", str(DEFAULT_HEIGHT))))
+        self.fps_input.setValue(int(s.get("fps", str(DEFAULT_FPS))))
+        self.quality_input.setCurrentText(s.get("quality", DEFAULT_QUALITY))
+        self.ai_mode_input.setCurrentText(s.get("ai_mode", "DeepSeek"))
+
+        self.deepseek_key.setText(s.get("deepseek_key", ""))
+        self.deepseek_base.setText(s.get("deepseek_base", DEFAULT_DEEPSEEK_BASE_URL))
+        self.deepseek_model.setText(s.get("deepseek_model", DEFAULT_DEEPSEEK_MODEL))
+
+        self.gemini_key.setText(s.get("gemini_key", ""))
+        self.gemini_model.setText(s.get("gemini_model", DEFAULT_GEMINI_MODEL))
         self._on_ai_mode_changed(self.ai_mode_input.currentText())
 
     def _save_settings(self) -> None:
@@ -826,45 +1409,90 @@ class MainWindow(QMainWindow):
         self.status.showMessage("设置已保存", 3000)
 
     def _load_history(self) -> None:
-        self.history_list.clear()
-        for segment in self._db.list_segments(self._active_workspace):
-            list_item = QListWidgetItem()
-            list_item.setData(Qt.ItemDataRole.UserRole, segment)
-            widget = self._build_segment_widget(segment)
-            list_item.setSizeHint(widget.sizeHint())
-            self.history_list.addItem(list_item)
-            self.history_list.setItemWidget(list_item, widget)
-
-    def _build_segment_widget(self, segment: Segment) -> QWidget:
-        container = QWidget()
-        layout = QHBoxLayout(container)
-        layout.setContentsMargins(20, 18, 20, 18)
-        layout.setSpacing(20)
-        
-        # 分段信息
-        info_layout = QVBoxLayout()
-        info_layout.setSpacing(10)
-        title = QLabel(f"<b>分段 #{segment.segment_index}</b>")
-        title.setStyleSheet(f"color: {Theme.COLORS['text_primary']}; font-size: 14px;")
-        desc = QLabel(segment.input_text[:100] + "..." if len(segment.input_text) > 100 else segment.input_text)
-        desc.setStyleSheet(f"color: {Theme.COLORS['text_secondary']}; font-size: 13px; line-height: 1.6;")
-        desc.setWordWrap(True)
-        desc.setMinimumHeight(45)
-        info_layout.addWidget(title)
-        info_layout.addWidget(desc)
-        
-        # 播放按钮
-        play_btn = QPushButton("播放")
-        play_btn.setFixedWidth(80)
-        play_btn.setFixedHeight(32)
-        play_btn.setEnabled(bool(segment.section_video_path))
-        play_btn.clicked.connect(lambda: self._play_segment(segment))
-        
-        layout.addLayout(info_layout, 1)
-        layout.addWidget(play_btn)
-        
-        return container
+        workspace = self._active_workspace
+        segments = self._segments_cache.get(workspace)
+        if segments is None:
+            segments = self._db.list_segments_meta(workspace)
+            self._segments_cache[workspace] = segments
+        self.history_model.reset_segments(segments)
+
+    def _append_segment(self, segment: Segment) -> None:
+        """新分段入列表头部：单行插入，不重查数据库不重置模型"""
+        meta = SegmentMeta(
+            id=segment.id,
+            workspace=segment.workspace,
+            segment_index=segment.segment_index,
+            input_text=segment.input_text,
+            section_video_path=segment.section_video_path,
+            created_at=segment.created_at,
+        )
+        cached = self._segments_cache.get(segment.workspace)
+        if cached is not None:
+            cached.insert(0, meta)
+        if segment.workspace == self._active_workspace:
+            self.history_model.insert_top(meta)
+
+    def _update_segment_history(self, segment: Segment, section_video_path: str) -> None:
+        """渲染完成后就地刷新单行（补上视频路径）"""
+        meta = SegmentMeta(
+            id=segment.id,
+            workspace=segment.workspace,
+            segment_index=segment.segment_index,
+            input_text=segment.input_text,
+            section_video_path=section_video_path,
+            created_at=segment.created_at,
+        )
+        cached = self._segments_cache.get(segment.workspace)
+        if cached is not None:
+            for i, existing in enumerate(cached):
+                if existing.id == meta.id:
+                    cached[i] = meta
+                    break
+        if segment.workspace == self._active_workspace:
+            self.history_model.update_segment(meta)
+
+    def _current_render_settings(self) -> RenderSettings:
+        """读取渲染设置：设置页未构建时退回数据库中的持久值"""
+        if self._settings_built:
+            return RenderSettings(
+                width=self.width_input.value(),
+                height=self.height_input.value(),
+                fps=self.fps_input.value(),
+                quality=self.quality_input.currentText(),
+            )
+        s = self._db.get_settings(["width", "height", "fps", "quality"])
+        return RenderSettings(
+            width=int(s.get("width", str(DEFAULT_WIDTH))),
+            height=int(s.get("height", str(DEFAULT_HEIGHT))),
+            fps=int(s.get("fps", str(DEFAULT_FPS))),
+            quality=s.get("quality", DEFAULT_QUALITY),
+        )
+
+    def _current_ai_settings(self) -> AISettings:
+        """读取 AI 配置：设置页未构建时退回数据库中的持久值"""
+        if self._settings_built:
+            return AISettings(
+                deepseek_api_key=self.deepseek_key.text().strip(),
+                deepseek_base_url=self.deepseek_base.text().strip(),
+                deepseek_model=self.deepseek_model.text().strip(),
+                gemini_api_key=self.gemini_key.text().strip(),
+                gemini_model=self.gemini_model.text().strip(),
+            )
+        s = self._db.get_settings(
+            ["deepseek_key", "deepseek_base", "deepseek_model", "gemini_key", "gemini_model"]
+        )
+        return AISettings(
+            deepseek_api_key=s.get("deepseek_key", ""),
+            deepseek_base_url=s.get("deepseek_base", DEFAULT_DEEPSEEK_BASE_URL),
+            deepseek_model=s.get("deepseek_model", DEFAULT_DEEPSEEK_MODEL),
+            gemini_api_key=s.get("gemini_key", ""),
+            gemini_model=s.get("gemini_model", DEFAULT_GEMINI_MODEL),
+        )
 
+    def _current_ai_mode_text(self) -> str:
+        if self._settings_built:
+            return self.ai_mode_input.currentText()
+        return self._db.get_setting("ai_mode", "DeepSeek")
 
     def _on_generate(self) -> None:
         prompt = self.prompt_input.toPlainText().strip()
@@ -872,7 +1500,7 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "提示", "请输入动画描述")
             return
 
-        if self._worker_thread is not None and self._worker_thread.isRunning():
+        if self._task_running:
             QMessageBox.information(self, "提示", "已有任务正在运行")
             return
 
@@ -882,58 +1510,40 @@ class MainWindow(QMainWindow):
         previous_code_str = self._db.get_latest_cumulative_code(self._active_workspace)
 
         self._current_segment = self._db.create_segment(self._active_workspace, prompt)
-        self._load_history()
+        self._append_segment(self._current_segment)
 
         self.generate_btn.setEnabled(False)
 
-        settings = RenderSettings(
-            width=self.width_input.value(),
-            height=self.height_input.value(),
-            fps=self.fps_input.value(),
-            quality=self.quality_input.currentText(),
-        )
+        settings = self._current_render_settings()
         previous_code = previous_code_str
-        ai_settings = AISettings(
-            deepseek_api_key=self.deepseek_key.text().strip(),
-            deepseek_base_url=self.deepseek_base.text().strip(),
-            deepseek_model=self.deepseek_model.text().strip(),
-            gemini_api_key=self.gemini_key.text().strip(),
-            gemini_model=self.gemini_model.text().strip(),
-        )
+        ai_settings = self._current_ai_settings()
+        ai_mode_text = self._current_ai_mode_text()
         self._log(
             f"输出设置: {settings.width}x{settings.height} @ {settings.fps}fps | 质量 {settings.quality}"
         )
-        self._log(f"AI 选择模式: {self.ai_mode_input.currentText()}")
+        self._log(f"AI 选择模式: {ai_mode_text}")
         self._log(f"分段索引: {self._current_segment.segment_index}")
 
         segment_dir = self._active_job_dir
         segment_dir.mkdir(parents=True, exist_ok=True)
-
-        ai_mode_text = self.ai_mode_input.currentText()
-        ai_mode = {
-            "DeepSeek": "deepseek",
-            "Gemini": "gemini",
-        }.get(ai_mode_text, "deepseek")
-        if ai_mode == "deepseek" and not ai_settings.deepseek_model:
-            QMessageBox.warning(self, "提示", "必须指定 DeepSeek 模型")
+        ai_mode = AI_MODE_MAP.get(ai_mode_text, "deepseek")
+        display_name, model_of = _REQUIRED_MODELS[ai_mode]
+        if not model_of(ai_settings):
+            QMessageBox.warning(self, "提示", f"必须指定 {display_name} 模型")
             self.generate_btn.setEnabled(True)
             return
-        if ai_mode == "gemini" and not ai_settings.gemini_model:
-            QMessageBox.warning(self, "提示", "必须指定 Gemini 模型")
-            self.generate_btn.setEnabled(True)
-            return
-        worker = RenderWorker(ai_settings, ai_mode, prompt, previous_code, settings, segment_dir)
-        self._current_worker = worker
-        worker.started.connect(lambda: self.status.showMessage("任务开始..."))
-        worker.progress.connect(self.status.showMessage)
-        worker.progress.connect(self._log)
-        worker.started.connect(lambda: self._log("渲染线程已启动"))
-        worker.failed.connect(self._on_failed)
-        worker.finished.connect(self._on_finished)
-        self._worker_thread = start_worker(worker)
-        self._log("渲染线程已启动请求已发送")
+        self._task_running = True
+        self.job_requested.emit(
+            RenderJob(ai_settings, ai_mode, prompt, previous_code, settings, segment_dir)
+        )
+
+    def _on_task_started(self) -> None:
+        self.status.showMessage("任务开始...")
+        self._log("渲染任务已启动")
 
     def _on_failed(self, message: str) -> None:
+        # 先冲掉缓冲中的进度行，保证日志顺序
+        self._flush_worker_progress()
         QMessageBox.critical(self, "错误", message)
         self.status.showMessage("任务失败", 3000)
         self._log(f"任务失败: {message}")
@@ -941,14 +1551,16 @@ class MainWindow(QMainWindow):
         # 删除失败的会话记录
         if self._current_segment is not None:
             self._db.delete_segment(self._current_segment.id)
+            self._segments_cache.pop(self._current_segment.workspace, None)
             self._load_history()
             self._log("已删除失败的会话记录")
         
         self.generate_btn.setEnabled(True)
-        self._current_worker = None
+        self._task_running = False
         self._current_segment = None
 
     def _on_finished(self, result: TaskResult) -> None:
+        self._flush_worker_progress()
         self.status.showMessage("开始播放")
         self._log(f"渲染完成，输出: {result.render_result.video_path}")
         self._log(f"分段视频: {len(result.render_result.section_videos)} 个")
@@ -959,29 +1571,31 @@ class MainWindow(QMainWindow):
                 section_video_path = str(result.render_result.video_path)
             else:
                 section_video_path = ""
-                if result.render_result.section_videos:
-                    sorted_videos = sorted(result.render_result.section_videos, key=lambda p: p.name)
-                    idx = self._current_segment.segment_index
-                    if idx < len(sorted_videos):
-                        section_video_path = str(sorted_videos[idx])
-                    else:
-                        section_video_path = str(sorted_videos[-1])
-
+                videos = result.render_result.section_videos
+                if videos:
+                    # 工作线程已按自然序排好，这里直接按索引取（越界则取末段）
+                    idx = min(self._current_segment.segment_index, len(videos) - 1)
+                    section_video_path = str(videos[idx])
+
+            manim_code = result.manim_code
+            # 及早放掉对 TaskResult/RenderResult 的引用，
+            # 后续播放期间不再钉住整组分段路径
+            del result
             self._db.update_segment_render(
                 self._current_segment.id,
-                result.manim_code,
+                manim_code,
                 section_video_path,
             )
-            self._load_history()
+            self._update_segment_history(self._current_segment, section_video_path)
 
-            # 播放当前分段
-            if section_video_path and Path(section_video_path).exists():
+            # 播放当前分段；路径出自刚完成的渲染结果，无需再 stat
+            if section_video_path:
                 updated_segment = Segment(
                     id=self._current_segment.id,
                     workspace=self._current_segment.workspace,
                     segment_index=self._current_segment.segment_index,
                     input_text=self._current_segment.input_text,
-                    cumulative_code=result.manim_code,
+                    cumulative_code=manim_code,
                     section_video_path=section_video_path,
                     created_at=self._current_segment.created_at,
                 )
@@ -990,42 +1604,63 @@ class MainWindow(QMainWindow):
                 self._log(f"未找到分段 #{{self._current_segment.segment_index}} 对应的视频")
         
         self.generate_btn.setEnabled(True)
-        self._current_worker = None
+        self._task_running = False
         self._current_segment = None
 
-    def _play_segment(self, segment: Segment) -> None:
-        """播放单个分段视频"""
+    def _play_segment(self, segment: Segment | SegmentMeta) -> None:
+        """播放单个分段视频（存在性检查在线程池完成后回调）"""
         if not segment.section_video_path:
             self._log(f"分段 #{segment.segment_index} 没有视频")
             return
-        video_path = Path(segment.section_video_path)
-        if not video_path.exists():
-            self._log(f"分段 #{segment.segment_index} 视频文件不存在")
+        self._pending_play[segment.section_video_path] = segment.segment_index
+        self._frame_pool.start(
+            _PathCheckTask(Path(segment.section_video_path), self._stat_relay)
+        )
+
+    def _on_play_path_checked(self, path_str: str, exists: bool) -> None:
+        segment_index = self._pending_play.pop(path_str, None)
+        if segment_index is None:
+            return
+        if not exists:
+            self._log(f"分段 #{segment_index} 视频文件不存在")
             return
-        self._log(f"播放分段 #{segment.segment_index}")
-        self._play_video_file(video_path)
+        self._log(f"播放分段 #{segment_index}")
+        self._play_video_file(Path(path_str), checked=True)
 
-    def _play_video_file(self, file_path: Path) -> None:
-        if not file_path.exists():
+    def _play_video_file(self, file_path: Path, checked: bool = False) -> None:
+        if not checked and not file_path.exists():
             self._log("视频文件不存在，无法播放")
             return
         self._reset_playback_state()
         self._playback_active = True
         self._ui_state.current_video = file_path
         self.player.show_video()
-        self.player_backend.setSource(QUrl.fromLocalFile(str(file_path)))
+        # 同源重播只回绕位置，管线保持热态；换源才重新协商
+        url = QUrl.fromLocalFile(str(file_path))
+        self._expected_source_url = url
+        if self.player_backend.source() == url:
+            self.player_backend.setPosition(0)
+        else:
+            self.player_backend.setSource(url)
         self.player_backend.play()
 
     def _on_media_status(self, status: QMediaPlayer.MediaStatus) -> None:
         if status == QMediaPlayer.MediaStatus.EndOfMedia:
             if not self._playback_active:
                 return
+            video_path = self._ui_state.current_video
             if self._ui_state.last_frame is None:
-                self._capture_current_frame()
+                # 先查磁盘上的定格帧缓存，避免 UI 线程整帧转换 + 拷贝
+                cached = self._load_cached_lastframe(video_path)
+                if cached is not None:
+                    self._ui_state.last_frame = cached
+                else:
+                    self._capture_current_frame()
             if self._ui_state.last_frame:
+                self._persist_lastframe(self._ui_state.last_frame, video_path)
                 self.player.show_last_frame(self._ui_state.last_frame)
-                self.player_backend.stop()
-                self.player_backend.setSource(QUrl())
+                # 只暂停不清源：解码管线保持热态，重播/换段免重建
+                self.player_backend.pause()
                 self._ui_state.current_video = None
                 self._playback_active = False
                 self.status.showMessage("播放结束，已定格最后一帧", 3000)
@@ -1033,9 +1668,25 @@ class MainWindow(QMainWindow):
             else:
                 self._log("播放结束，无最后一帧可显示")
 
+    @staticmethod
+    def _load_cached_lastframe(video_path: Path | None) -> QImage | None:
+        if video_path is None:
+            return None
+        sibling = _lastframe_path(video_path)
+        if not sibling.exists():
+            return None
+        image = QImage(str(sibling))
+        return None if image.isNull() else image
+
+    def _persist_lastframe(self, image: QImage, video_path: Path | None) -> None:
+        """定格帧异步落盘（已有缓存时跳过）"""
+        if video_path is None or _lastframe_path(video_path).exists():
+            return
+        self._frame_pool.start(_SaveFrameTask(image, video_path))
+
     def _reset_playback_state(self) -> None:
         self.player_backend.stop()
-        self.player_backend.setSource(QUrl())
+        self.player_backend.setPosition(0)
         self._play_queue = []
         self._ui_state.last_frame = None
         self._ui_state.current_video = None
@@ -1044,16 +1695,43 @@ class MainWindow(QMainWindow):
     def _on_video_frame(self, frame) -> None:
         if not self._playback_active:
             return
-        current = self._ui_state.current_video
-        if current is None:
+        if self._ui_state.current_video is None:
             return
-        source = self.player_backend.source()
-        if source != QUrl.fromLocalFile(str(current)):
+        # 与 _play_video_file 预先构建的 QUrl 比较：
+        # 该回调按视频帧率触发，每帧做 Path→str→QUrl 转换太浪费
+        if self.player_backend.source() != self._expected_source_url:
             return
-        if frame.isValid():
-            image = frame.toImage()
-            if not image.isNull():
-                self._ui_state.last_frame = image.copy()
+        if not frame.isValid():
+            return
+        # 转换任务在飞时只保留最新帧：慢的 Python 处理不会积压队列
+        if self._frame_inflight:
+            self._pending_frame = frame
+            return
+        # 节流到约 30Hz，并把 toImage() + 降采样丢给线程池，
+        # 避免按视频帧率在 GUI 线程做全分辨率转换
+        now = time.monotonic()
+        if now - self._last_frame_ts < 0.033:
+            return
+        self._last_frame_ts = now
+        self._start_frame_conversion(frame)
+
+    def _start_frame_conversion(self, frame) -> None:
+        self._frame_inflight = True
+        self._frame_pool.start(
+            _FrameConversionTask(frame, self.player.video_widget.size(), self._frame_relay)
+        )
+
+    def _on_frame_converted(self, image: QImage) -> None:
+        if self._playback_active and not image.isNull():
+            self._ui_state.last_frame = image
+        # 若转换期间又到了新帧，只处理被覆盖后的最新一帧
+        pending = self._pending_frame
+        self._pending_frame = None
+        if pending is not None and self._playback_active:
+            self._last_frame_ts = time.monotonic()
+            self._start_frame_conversion(pending)
+        else:
+            self._frame_inflight = False
 
     def _capture_current_frame(self) -> None:
         video_sink = self.player.video_widget.videoSink()
@@ -1070,6 +1748,12 @@ class MainWindow(QMainWindow):
             return
         self._ui_state.last_frame = image.copy()
 
+    def closeEvent(self, event) -> None:  # noqa: N802
+        # 常驻渲染线程随窗口退出，避免 QThread 析构告警
+        self._worker_thread.quit()
+        self._worker_thread.wait(3000)
+        super().closeEvent(event)
+
 
 def run_app(db: Database, jobs_dir: Path) -> None:
     app = QApplication([])
@@ -1079,4 +1763,6 @@ def run_app(db: Database, jobs_dir: Path) -> None:
     
     window = MainWindow(db, jobs_dir)
     window.show()
+    # 首帧之后再预热 AI 客户端与 manim，与用户输入提示词的时间重叠
+    ensure_background_warmup()
     app.exec()
@@ -1,13 +1,77 @@
 from __future__ import annotations
 
+import subprocess
+import sys
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from PySide6.QtCore import QObject, QThread, Signal
+from PySide6.QtCore import QObject, QThread, Signal, Slot
 
-from app.ai_clients import generate_manim_code, sanitize_code, ensure_section_addition
-from app.config import AISettings, RenderSettings
-from app.manim_runner import RenderResult, render_manim_scene
+from app.ai_cache import PromptCache, make_prompt_key
+from app.config import AISettings, DATA_DIR, DB_NAME, RenderSettings
+
+if TYPE_CHECKING:
+    from app.manim_runner import RenderResult
+
+# ai_clients 拉起 httpx/openai，导入明显拖慢 GUI 冷启动；
+# 延迟到首个任务（或后台预热线程）再导入，窗口先行显示
+
+
+_prompt_cache: PromptCache | None = None
+
+
+def _get_prompt_cache() -> PromptCache:
+    global _prompt_cache
+    if _prompt_cache is None:
+        _prompt_cache = PromptCache(DATA_DIR / DB_NAME)
+    return _prompt_cache
+
+
+_warmup_lock = threading.Lock()
+_warmup_thread: threading.Thread | None = None
+
+
+def _warmup_manim() -> None:
+    """后台预热：导入 AI 客户端栈并空转导入一次 manim
+
+    渲染在 manim CLI 子进程中进行，本进程从不导入 manim；会话内
+    首次渲染的大头是子进程冷导入 numpy/cairo 等的磁盘读取。提前
+    在后台跑一次 import，首次渲染的子进程启动可省 1-2s。
+    ai_clients（httpx/openai）则在本线程预先导入，首个任务的
+    延迟导入直接命中 sys.modules。
+    """
+    try:
+        import app.ai_clients  # noqa: F401
+    except ImportError:
+        pass
+    try:
+        subprocess.run(
+            [sys.executable, "-c", "import manim"],
+            capture_output=True,
+            timeout=60,
+            check=False,
+        )
+    except (OSError, subprocess.SubprocessError):
+        pass
+
+
+def ensure_background_warmup() -> threading.Thread:
+    """启动（至多一次）后台预热线程并返回
+
+    窗口显示后即可调用，预热与用户输入首个提示词的时间重叠；
+    未调用时首个任务开始处也会兜底触发。
+    """
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(
+                target=_warmup_manim, name="manim-warmup", daemon=True
+            )
+            _warmup_thread.start()
+        return _warmup_thread
 
 
 @dataclass(frozen=True)
@@ -17,51 +81,107 @@ class TaskResult:
     manim_code: str
 
 
+@dataclass(frozen=True)
+class RenderJob:
+    """一次生成任务的全部参数（经队列信号投递到常驻工作线程）"""
+    ai_settings: AISettings
+    ai_mode: str
+    prompt: str
+    previous_code: str
+    settings: RenderSettings
+    job_dir: Path
+
+
 class RenderWorker(QObject):
+    """常驻工作者：随线程存活，逐个处理投递来的 RenderJob
+
+    复用同一线程意味着模块级的 HTTP 连接池、延迟统计与缓存
+    状态在任务之间保持热态，也省掉每次提交的线程创建开销。
+    """
+
     started = Signal()
     progress = Signal(str)
-    finished = Signal(TaskResult)
+    # object 签名让结果按 Python 引用跨线程传递，
+    # 免去队列投递时对自定义类型的元类型查找与转换尝试
+    finished = Signal(object)
     failed = Signal(str)
 
-    def __init__(
-        self,
-        ai_settings: AISettings,
-        ai_mode: str,
-        prompt: str,
-        previous_code: str,
-        settings: RenderSettings,
-        job_dir: Path,
-    ) -> None:
+    def __init__(self) -> None:
         super().__init__()
-        self._ai_settings = ai_settings
-        self._ai_mode = ai_mode
-        self._prompt = prompt
-        self._previous_code = previous_code
-        self._settings = settings
-        self._job_dir = job_dir
-
-    def run(self) -> None:
+        # 进度行在工作线程侧合批：manim 渲染每秒可产生上百行日志，
+        # 逐行跨线程 emit 会让 GUI 线程被排队调用淹没
+        self._progress_buffer: list[str] = []
+        self._last_progress_emit = 0.0
+
+    def _emit_progress(self, message: str) -> None:
+        self._progress_buffer.append(message)
+        now = time.monotonic()
+        if now - self._last_progress_emit >= 0.05:
+            self._flush_progress(now)
+
+    def _flush_progress(self, now: float | None = None) -> None:
+        if self._progress_buffer:
+            self.progress.emit("\n".join(self._progress_buffer))
+            self._progress_buffer.clear()
+            self._last_progress_emit = now if now is not None else time.monotonic()
+
+    @staticmethod
+    def _model_name(job: RenderJob) -> str:
+        if job.ai_mode == "gemini":
+            return job.ai_settings.gemini_model
+        return job.ai_settings.deepseek_model
+
+    @Slot(object)
+    def run_job(self, job: RenderJob) -> None:
+        cache = _get_prompt_cache()
+        cache_key = make_prompt_key(
+            job.ai_mode, self._model_name(job), job.prompt, job.previous_code
+        )
+        # 预热与 AI 调用重叠：等 AI 返回时页缓存通常已热
+        warmup = ensure_background_warmup()
+        from app.ai_clients import (
+            ensure_section_addition,
+            generate_manim_code,
+            sanitize_code,
+        )
+        from app.manim_runner import render_manim_scene
+
         try:
             self.started.emit()
-            self.progress.emit("调用 AI 生成代码...")
-            provider, code = generate_manim_code(
-                self._ai_settings,
-                self._ai_mode,
-                self._prompt,
-                self._previous_code,
-                debug=self.progress.emit,
-            )
-            code = sanitize_code(code, previous_code=self._previous_code)
-            # 确保正确添加了分段
-            code = ensure_section_addition(self._previous_code, code, self._prompt)
-            self.progress.emit(f"AI ({provider}) 已返回代码，开始渲染...")
+            # 重复提交去重：所有任务经队列信号在本线程串行执行，
+            # 同键任务不可能并发——后到者在此命中首个任务写入的缓存，
+            # 直接复用最终代码，跳过 AI 往返与后处理；渲染随后命中分段缓存
+            cached = cache.get(cache_key)
+            if cached is not None:
+                provider, code = cached
+                self._emit_progress("命中任务缓存，跳过 AI 调用")
+            else:
+                self._emit_progress("调用 AI 生成代码...")
+                provider, code = generate_manim_code(
+                    job.ai_settings,
+                    job.ai_mode,
+                    job.prompt,
+                    job.previous_code,
+                    debug=self._emit_progress,
+                )
+                code = sanitize_code(code, previous_code=job.previous_code)
+                # 确保正确添加了分段
+                code = ensure_section_addition(job.previous_code, code, job.prompt)
+            self._emit_progress(f"AI ({provider}) 已返回代码，开始渲染...")
+            # 避免预热进程与渲染子进程争抢磁盘 I/O
+            if warmup.is_alive():
+                warmup.join(timeout=10)
             render_result = render_manim_scene(
                 code,
-                self._settings,
-                self._job_dir,
-                logger=self.progress.emit,
+                job.settings,
+                job.job_dir,
+                logger=self._emit_progress,
             )
-            self.progress.emit("渲染完成")
+            # 渲染成功后才入缓存，失败的代码不会被记住
+            if cached is None:
+                cache.set(cache_key, provider, code)
+            self._emit_progress("渲染完成")
+            self._flush_progress()
             self.finished.emit(
                 TaskResult(
                     ai_provider=provider,
@@ -70,15 +190,16 @@ class RenderWorker(QObject):
                 )
             )
         except Exception as exc:  # noqa: BLE001
+            # 命中的缓存条目若已无法渲染（如产物被清理）则移除
+            cache.invalidate(cache_key)
+            self._flush_progress()
             self.failed.emit(str(exc))
 
 
-def start_worker(worker: RenderWorker) -> QThread:
+def start_worker_thread(worker: RenderWorker) -> QThread:
+    """把常驻工作者移入新线程并启动；线程跨任务复用，不随任务退出"""
     thread = QThread()
     worker.moveToThread(thread)
-    thread.started.connect(worker.run)
-    worker.finished.connect(thread.quit)
-    worker.failed.connect(thread.quit)
     thread.finished.connect(worker.deleteLater)
     thread.start()
     return thread